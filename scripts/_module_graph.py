@@ -0,0 +1,104 @@
+"""
+Terraform module dependency graph.
+
+Maps every directory that calls a local module (``source = "../foo"``) to the
+module directories it depends on, so a change to one module can also select
+the modules that consume it. The graph is cached on disk and only rebuilt when
+a ``.tf`` file under the scanned tree has been added, removed or modified.
+"""
+
+import json
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from _source_files import walk_ext
+
+CACHE_PATH = Path(__file__).parent / ".module_graph.json"
+
+_SOURCE_RE = re.compile(rb'source\s*=\s*"(\.\.?/[^"]+)"')
+# Hand-written .tf files are far smaller; anything bigger is generated output
+_MAX_TF_BYTES = 512 * 1024
+
+
+def _tf_files(root: Path) -> List[str]:
+    """List every ``.tf`` file under ``root``, skipping metadata and dependencies."""
+    return list(walk_ext(str(root), ".tf"))
+
+
+def _fingerprint(files: List[str]) -> Tuple[int, int]:
+    """Newest mtime plus file count; either changes when the tree does."""
+    newest = max((os.stat(f).st_mtime_ns for f in files), default=0)
+    return newest, len(files)
+
+
+def build_module_graph(files: List[str]) -> Dict[str, List[str]]:
+    """Scan ``files`` for local module sources.
+
+    Returns:
+        ``{consumer_dir: [dependency_dir, ...]}`` with POSIX paths relative to
+        the current directory
+    """
+    graph: Dict[str, Set[str]] = {}
+    for tf_file in files:
+        if os.path.getsize(tf_file) > _MAX_TF_BYTES:
+            continue
+        # Sources are plain ASCII paths, so the bytes are never decoded whole
+        with open(tf_file, "rb") as handle:
+            sources = _SOURCE_RE.findall(handle.read())
+        if not sources:
+            continue
+        consumer = os.path.dirname(tf_file)
+        deps = graph.setdefault(Path(consumer).as_posix(), set())
+        for source in sources:
+            target = os.path.normpath(os.path.join(consumer, os.fsdecode(source)))
+            deps.add(Path(target).as_posix())
+    return {consumer: sorted(deps) for consumer, deps in graph.items()}
+
+
+def load_module_graph(
+    root: Path = Path("terraform"), cache_path: Path = CACHE_PATH
+) -> Dict[str, List[str]]:
+    """Return the module graph for ``root``, rebuilding the cache if stale."""
+    files = _tf_files(root)
+    newest, count = _fingerprint(files)
+
+    try:
+        with open(cache_path, encoding="utf-8") as handle:
+            cached = json.load(handle)
+        if cached.get("root") == root.as_posix() and cached.get("mtime") == newest:
+            if cached.get("count") == count:
+                graph: Dict[str, List[str]] = cached["graph"]
+                return graph
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    graph = build_module_graph(files)
+    payload = {"root": root.as_posix(), "mtime": newest, "count": count}
+    try:
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({**payload, "graph": graph}, handle)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # the cache is only an optimisation
+    return graph
+
+
+def expand_dependents(graph: Dict[str, List[str]], changed: Iterable[str]) -> Set[str]:
+    """Return ``changed`` plus every directory that transitively consumes it."""
+    dependents: Dict[str, List[str]] = {}
+    for consumer, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(consumer)
+
+    seen = set(changed)
+    queue = deque(seen)
+    while queue:
+        for consumer in dependents.get(queue.popleft(), ()):
+            if consumer not in seen:
+                seen.add(consumer)
+                queue.append(consumer)
+    return seen
@@ -0,0 +1,21 @@
+"""
+Source file discovery shared by the development scripts.
+
+Walks a tree for files with a given extension, pruning directories that only
+hold dependencies, caches or VCS metadata instead of descending into them.
+"""
+
+import os
+from typing import Iterator
+
+# Directories never worth descending into when looking for source files.
+SKIP_DIRS = frozenset({".git", "__pycache__", ".venv", "node_modules", ".terraform"})
+
+
+def walk_ext(root: str, ext: str) -> Iterator[str]:
+    """Yield files under ``root`` ending in ``ext``, skipping ``SKIP_DIRS``."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name.endswith(ext):
+                yield os.path.join(dirpath, name)
@@ -6,182 +6,328 @@ This script formats Python and Terraform code using the tools installed
 in the Poetry virtual environment.
 """
 
+import argparse
+import heapq
+import os
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-import click
+from _source_files import walk_ext
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 console = Console()
 
+# Every kind of file ``terraform fmt`` formats
+_TF_FMT_SUFFIXES = (".tf", ".tfvars", ".tftest.hcl")
+
+
+def _format_files(
+    files: List[str], settings_path: str
+) -> List[Tuple[str, bool, bool, Optional[str]]]:
+    """Sort imports and format ``files`` in place with isort and black.
+
+    Runs inside a worker process, so it must stay a picklable module-level
+    function. Returns ``(file, isort_changed, black_changed, error)`` per file.
+    """
+    import black
+    import isort
+
+    isort_config = isort.Config(
+        settings_path=settings_path, profile="black", quiet=True
+    )
+    mode = black.Mode(line_length=88, target_versions={black.TargetVersion.PY39})
+
+    results: List[Tuple[str, bool, bool, Optional[str]]] = []
+    for name in files:
+        try:
+            sorted_ = isort.file(name, config=isort_config)
+            changed = black.format_file_in_place(
+                Path(name), fast=False, mode=mode, write_back=black.WriteBack.YES
+            )
+        except Exception as e:
+            results.append((name, False, False, str(e) or type(e).__name__))
+        else:
+            results.append((name, sorted_, changed, None))
+    return results
+
 
 class CodeFormatter:
     """Handles formatting of Python and Terraform code."""
 
-    def __init__(self, base_path: Path):
+    # Resolved once per process so each launch skips the PATH search.
+    _TERRAFORM = shutil.which("terraform") or "terraform"
+
+    def __init__(self, base_path: Path, jobs: Optional[int] = None):
         self.base_path = base_path
+        self.jobs = jobs or os.cpu_count() or 1
         self.errors: List[str] = []
+        self._file_sizes: Dict[str, int] = {}
+        self._glob_cache: Dict[Tuple[Path, str], List[Path]] = {}
 
     def format_python_code(self, paths: List[Path]) -> bool:
-        """Format Python code using black and isort."""
+        """Format Python code using isort and black."""
         console.print("\n[bold blue]Formatting Python Code[/bold blue]")
 
-        success = True
-
-        # Run black formatter
-        if not self._run_black(paths):
-            success = False
+        # Validate and expand the paths once; every formatter reuses the list.
+        files = self._expand_python_files(paths)
+        if not files:
+            console.print("  ⚠️  No Python paths found to format")
+            return True
 
-        # Run isort for import sorting
-        if not self._run_isort(paths):
-            success = False
-
-        return success
+        return self._run_python_formatters(files)
 
     def format_terraform_code(self, paths: List[Path]) -> bool:
         """Format Terraform code using terraform fmt."""
         console.print("\n[bold blue]Formatting Terraform Code[/bold blue]")
 
-        success = True
+        roots = self._collapse_nested(paths)
+        cache = self._load_tf_cache()
+        stats = self._scan_tf_files(roots)
+
+        # Only directories holding a file that changed since the last
+        # successful run need formatting again.
+        changed_dirs = sorted(
+            {
+                Path(file).parent
+                for file, stat in stats.items()
+                if cache.get(file) != stat
+            }
+        )
+        if not changed_dirs:
+            console.print("  ✅ No Terraform files changed since the last format")
+            return True
 
-        for path in paths:
-            if not self._run_terraform_fmt(path):
-                success = False
+        if not self._run_terraform_fmt(changed_dirs):
+            return False
 
-        return success
+        # terraform fmt may have rewritten files, so record their new stats.
+        cache.update(self._scan_tf_files(roots))
+        self._save_tf_cache(cache)
+        return True
 
-    def _run_black(self, paths: List[Path]) -> bool:
-        """Run black Python formatter."""
-        try:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task("Running black formatter...", total=None)
-
-                path_strings = [str(p) for p in paths if p.exists()]
-                if not path_strings:
-                    progress.remove_task(task)
-                    console.print("  ⚠️  No Python paths found to format")
-                    return True
-
-                result = subprocess.run(
-                    ["black", "--line-length", "88"] + path_strings,
-                    capture_output=True,
-                    text=True,
-                )
-
-                progress.remove_task(task)
-
-            if result.returncode == 0:
-                console.print("  ✅ Black formatting completed")
-                if result.stdout.strip():
-                    console.print(f"     {result.stdout.strip()}")
-                return True
-            else:
-                self.errors.append(f"Black formatting failed: {result.stderr}")
-                console.print("  ❌ Black formatting failed")
-                console.print(f"     {result.stderr}")
-                return False
+    def _run_python_formatters(self, files: List[str]) -> bool:
+        """Run isort and black in-process over the same existing files.
 
-        except FileNotFoundError:
-            self.errors.append("Black not found. Install with Poetry.")
-            console.print("  ❌ Black not found. Run 'poetry install'")
+        Each file is sorted by isort before black formats it, so black has the
+        final say. Shards are handed to a process pool so large trees still use
+        every core, without starting a fresh interpreter per tool.
+        """
+        try:
+            import black  # noqa: F401
+            import isort  # noqa: F401
+        except ImportError as e:
+            tool = (e.name or "formatter").capitalize()
+            self.errors.append(f"{tool} not found. Install with Poetry.")
+            console.print(f"  ❌ {tool} not found. Run 'poetry install'")
             return False
-        except subprocess.CalledProcessError as e:
-            self.errors.append(f"Error running black: {e}")
-            console.print(f"  ❌ Error running black: {e}")
+
+        shards = self._shard(files)
+        results: List[Tuple[str, bool, bool, Optional[str]]] = []
+
+        with console.status("Running isort and black..."):
+            if len(shards) == 1:
+                results.extend(_format_files(shards[0], str(self.base_path)))
+            else:
+                with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+                    for shard_results in pool.map(
+                        _format_files, shards, repeat(str(self.base_path))
+                    ):
+                        results.extend(shard_results)
+
+        sorted_files = [name for name, sorted_, _, _ in results if sorted_]
+        reformatted = [name for name, _, changed, _ in results if changed]
+        failures = [(name, error) for name, _, _, error in results if error]
+
+        if failures:
+            console.print(f"  ❌ Python formatting failed for {len(failures)} file(s)")
+            for name, error in failures:
+                self.errors.append(f"Formatting failed for {name}: {error}")
+                console.print(f"     {name}: {error}")
             return False
 
-    def _run_isort(self, paths: List[Path]) -> bool:
-        """Run isort import sorter."""
-        try:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task("Running isort...", total=None)
-
-                path_strings = [str(p) for p in paths if p.exists()]
-                if not path_strings:
-                    progress.remove_task(task)
-                    console.print("  ⚠️  No Python paths found to sort imports")
-                    return True
-
-                result = subprocess.run(
-                    ["isort", "--profile", "black"] + path_strings,
-                    capture_output=True,
-                    text=True,
-                )
-
-                progress.remove_task(task)
-
-            if result.returncode == 0:
-                console.print("  ✅ Import sorting completed")
-                return True
+        console.print("  ✅ Import sorting completed")
+        for name in sorted_files:
+            console.print(f"     Fixing {name}")
+        console.print("  ✅ Black formatting completed")
+        for name in reformatted:
+            console.print(f"     reformatted {name}")
+        return True
+
+    def _expand_python_files(self, paths: List[Path]) -> List[str]:
+        """Expand directories into Python files, ordered largest first."""
+        candidates: List[str] = []
+        for path in paths:
+            if path.is_dir():
+                candidates.extend(str(p) for p in self._cached_glob(path, "**/*.py"))
             else:
-                self.errors.append(f"Isort failed: {result.stderr}")
-                console.print("  ❌ Import sorting failed")
-                console.print(f"     {result.stderr}")
-                return False
+                candidates.append(str(path))
+
+        # A single stat per file both filters out missing paths and records
+        # the size used to balance the shards.
+        files: List[str] = []
+        for name in candidates:
+            if name not in self._file_sizes:
+                try:
+                    self._file_sizes[name] = os.stat(name).st_size
+                except OSError:
+                    continue
+            files.append(name)
+
+        files.sort(key=self._file_sizes.__getitem__, reverse=True)
+        return files
+
+    def _shard(self, files: List[str]) -> List[List[str]]:
+        """Split files into at most ``self.jobs`` shards of similar total size.
+
+        Files are handed out largest first, each to the currently lightest
+        shard, so no single worker is left holding the biggest files alone.
+        """
+        count = max(1, min(self.jobs, len(files)))
+        shards: List[List[str]] = [[] for _ in range(count)]
+        heap = [(0, 0, index) for index in range(count)]
+
+        for name in files:
+            load, _, index = heapq.heappop(heap)
+            shards[index].append(name)
+            load += self._file_sizes.get(name, 0)
+            heapq.heappush(heap, (load, len(shards[index]), index))
+
+        return [shard for shard in shards if shard]
+
+    def _run_terraform_fmt(self, paths: List[Path]) -> bool:
+        """Run terraform fmt on several directories with overlapping processes.
+
+        Each directory is formatted non-recursively; callers pass every
+        directory that needs it. Every ``terraform fmt`` is started before any
+        is waited on, so the Go binary start-up cost is paid concurrently
+        rather than once per path.
+        """
+        try:
+            with console.status("Running terraform fmt..."):
+                procs = [
+                    (
+                        path,
+                        subprocess.Popen(
+                            [self._TERRAFORM, "fmt"],
+                            cwd=path,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            text=True,
+                        ),
+                    )
+                    for path in paths
+                ]
+                results = []
+                for path, proc in procs:
+                    stdout, stderr = proc.communicate()
+                    results.append((path, proc.returncode, stdout, stderr))
 
         except FileNotFoundError:
-            self.errors.append("Isort not found. Install with Poetry.")
-            console.print("  ❌ Isort not found. Run 'poetry install'")
-            return False
-        except subprocess.CalledProcessError as e:
-            self.errors.append(f"Error running isort: {e}")
-            console.print(f"  ❌ Error running isort: {e}")
+            self.errors.append("Terraform not found. Please install Terraform.")
+            console.print("  ❌ Terraform not found. Please install Terraform.")
             return False
 
-    def _run_terraform_fmt(self, path: Path) -> bool:
-        """Run terraform fmt on a directory."""
-        try:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task(f"Formatting {path.name}...", total=None)
-
-                result = subprocess.run(
-                    ["terraform", "fmt", "-recursive"],
-                    cwd=path,
-                    capture_output=True,
-                    text=True,
-                )
-
-                progress.remove_task(task)
-
-            if result.returncode == 0:
+        success = True
+        for path, returncode, stdout, stderr in results:
+            if returncode == 0:
                 console.print(f"  ✅ Terraform formatting completed for {path.name}")
-                if result.stdout.strip():
-                    # Show which files were formatted
-                    formatted_files = result.stdout.strip().split("\n")
-                    for file in formatted_files:
-                        if file.strip():
-                            console.print(f"     Formatted: {file}")
-                return True
+                # Show which files were formatted
+                for file in stdout.strip().split("\n"):
+                    if file.strip():
+                        console.print(f"     Formatted: {file}")
             else:
-                self.errors.append(f"Terraform fmt failed for {path}: {result.stderr}")
+                success = False
+                self.errors.append(f"Terraform fmt failed for {path}: {stderr}")
                 console.print(f"  ❌ Terraform formatting failed for {path.name}")
-                console.print(f"     {result.stderr}")
-                return False
+                console.print(f"     {stderr}")
 
-        except FileNotFoundError:
-            self.errors.append("Terraform not found. Please install Terraform.")
-            console.print("  ❌ Terraform not found. Please install Terraform.")
-            return False
-        except subprocess.CalledProcessError as e:
-            self.errors.append(f"Error running terraform fmt: {e}")
-            console.print(f"  ❌ Error running terraform fmt: {e}")
-            return False
+        return success
+
+    @staticmethod
+    def _collapse_nested(paths: List[Path]) -> List[Path]:
+        """Drop paths that lie inside another of the given paths.
+
+        Each remaining path is scanned recursively for changed files, so a
+        path inside another one would only be scanned twice.
+        """
+        roots: List[Path] = []
+        for path in sorted({p.resolve() for p in paths}, key=lambda p: len(p.parts)):
+            if not any(root == path or root in path.parents for root in roots):
+                roots.append(path)
+        return roots
+
+    @property
+    def _tf_cache_path(self) -> Path:
+        return self.base_path / ".cache" / "format-tf.json"
+
+    def _load_tf_cache(self) -> Dict[str, List[int]]:
+        """Load the ``path -> [mtime_ns, size]`` map from the last format run."""
+        import json
+
+        try:
+            with open(self._tf_cache_path, encoding="utf-8") as handle:
+                cache = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_tf_cache(self, cache: Dict[str, List[int]]) -> None:
+        """Write the format cache atomically so a crash never leaves it torn."""
+        import json
+
+        cache_path = self._tf_cache_path
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(cache, handle)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            console.print(f"  ⚠️  Could not write format cache: {e}")
+
+    @staticmethod
+    def _scan_tf_files(roots: List[Path]) -> Dict[str, List[int]]:
+        """Collect ``[mtime_ns, size]`` for every file ``terraform fmt`` formats.
+
+        That is each ``.tf``, ``.tfvars`` and ``.tftest.hcl`` file under
+        ``roots``. Hidden directories such as ``.terraform`` and ``.git`` are
+        skipped.
+        """
+        stats: Dict[str, List[int]] = {}
+        pending = [str(root) for root in roots]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(_TF_FMT_SUFFIXES):
+                        stat = entry.stat()
+                        stats[entry.path] = [stat.st_mtime_ns, stat.st_size]
+        return stats
+
+    def _cached_glob(self, path: Path, pattern: str) -> List[Path]:
+        """Glob ``pattern`` under ``path``, reusing earlier results in this run."""
+        key = (path, pattern)
+        if key not in self._glob_cache:
+            if pattern.startswith("**/*."):
+                # Recursive extension globs walk the tree once, pruning
+                # dependency and cache directories instead of descending them.
+                files = [Path(f) for f in walk_ext(str(path), pattern[len("**/*") :])]
+            else:
+                files = list(path.glob(pattern))
+            self._glob_cache[key] = files
+        return self._glob_cache[key]
 
     def find_python_paths(self) -> List[Path]:
         """Find Python directories and files to format."""
@@ -198,7 +344,7 @@ class CodeFormatter:
             paths.append(tests_dir)
 
         # Add any Python files in root
-        for py_file in self.base_path.glob("*.py"):
+        for py_file in self._cached_glob(self.base_path, "*.py"):
             paths.append(py_file)
 
         return paths
@@ -212,34 +358,60 @@ class CodeFormatter:
         if terraform_dir.exists():
             paths.append(terraform_dir)
 
-        # Add any .tf files in root
-        if list(self.base_path.glob("*.tf")):
+        # Add the root itself if it holds any Terraform files
+        if any(
+            self._cached_glob(self.base_path, f"*{suffix}")
+            for suffix in _TF_FMT_SUFFIXES
+        ):
             paths.append(self.base_path)
 
         return paths
 
 
-@click.command()
-@click.option("--python-only", is_flag=True, help="Format only Python code")
-@click.option("--terraform-only", is_flag=True, help="Format only Terraform code")
-@click.option("--check", is_flag=True, help="Check formatting without making changes")
-@click.option(
-    "--path",
-    type=click.Path(exists=True),
-    multiple=True,
-    help="Specific paths to format (can be used multiple times)",
-)
-def main(
-    python_only: bool, terraform_only: bool, check: bool, path: Tuple[str, ...]
-) -> None:
+def _git_changed_files(base_path: Path) -> Optional[List[Path]]:
+    """Return existing files changed relative to HEAD, or None outside git.
+
+    Covers unstaged and staged edits plus untracked files, so a newly added
+    module is formatted too. Deleted files are dropped.
+    """
+
+    def git(*args: str) -> "subprocess.CompletedProcess[str]":
+        return subprocess.run(
+            ["git", *args], cwd=base_path, capture_output=True, text=True
+        )
+
+    try:
+        toplevel = git("rev-parse", "--show-toplevel")
+    except FileNotFoundError:
+        return None
+    if toplevel.returncode != 0:
+        return None
+    root = Path(toplevel.stdout.strip())
+
+    names: Set[str] = set()
+    for args in (
+        ("diff", "--name-only", "HEAD"),
+        ("diff", "--name-only", "--cached"),
+        ("ls-files", "--others", "--exclude-standard", "--full-name"),
+    ):
+        names.update(line for line in git(*args).stdout.splitlines() if line)
+
+    return [root / name for name in sorted(names) if (root / name).is_file()]
+
+
+def _existing_path(value: str) -> str:
+    """argparse type that rejects paths which do not exist."""
+    if not os.path.exists(value):
+        raise argparse.ArgumentTypeError(f"Path '{value}' does not exist.")
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Format Python and Terraform code using black, isort, and terraform fmt.
 
     Args:
-        python_only: Format only Python code
-        terraform_only: Format only Terraform code
-        check: Check formatting without making changes
-        path: Specific paths to format
+        argv: Command line arguments, defaulting to ``sys.argv[1:]``
 
     Examples:
         python scripts/format.py                    # Format all code
@@ -247,11 +419,60 @@ def main(
         python scripts/format.py --terraform-only  # Format only Terraform
         python scripts/format.py --check           # Check without changes
         python scripts/format.py --path scripts/   # Format specific path
+        python scripts/format.py --changed         # Format only changed files
+        python scripts/format.py --jobs 4          # Use 4 formatter processes
     """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Format Python and Terraform code using black, isort, and terraform fmt."
+        )
+    )
+    parser.add_argument(
+        "--python-only", action="store_true", help="Format only Python code"
+    )
+    parser.add_argument(
+        "--terraform-only", action="store_true", help="Format only Terraform code"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Check formatting without making changes",
+    )
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument(
+        "--changed",
+        action="store_true",
+        help="Format only files changed relative to HEAD (falls back to all code "
+        "outside a git repository)",
+    )
+    scope.add_argument(
+        "--path",
+        type=_existing_path,
+        action="append",
+        default=[],
+        help="Specific paths to format (can be used multiple times)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel formatter processes (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+    python_only: bool = args.python_only
+    terraform_only: bool = args.terraform_only
+    check: bool = args.check
+    changed: bool = args.changed
+    path: List[str] = args.path
+    jobs: Optional[int] = args.jobs
+
+    # Rich panels are only needed for the banner, so load them here.
+    from rich.panel import Panel
+
     # Convert string paths to Path objects
     format_paths = [Path(p) for p in path] if path else []
     base_path = Path.cwd()
-    formatter = CodeFormatter(base_path)
+    formatter = CodeFormatter(base_path, jobs=jobs)
 
     console.print(
         Panel.fit(
@@ -270,14 +491,33 @@ def main(
     if check:
         console.print("[yellow]Check mode: No files will be modified[/yellow]")
 
+    changed_files = _git_changed_files(base_path) if changed else None
+    if changed and changed_files is None:
+        console.print("[yellow]Not a git repository: formatting all code[/yellow]")
+
     # Get paths to format
-    if format_paths:
-        python_paths = [
-            p
-            for p in format_paths
-            if p.suffix == ".py" or (p.is_dir() and any(p.rglob("*.py")))
-        ]
-        terraform_paths = [p for p in format_paths if any(p.rglob("*.tf"))]
+    if changed_files is not None:
+        python_paths = [f for f in changed_files if f.suffix == ".py"]
+        terraform_paths = sorted(
+            {f.parent for f in changed_files if f.name.endswith(_TF_FMT_SUFFIXES)}
+        )
+    elif format_paths:
+        python_paths = []
+        terraform_paths = []
+        for p in format_paths:
+            # Classify each path once; the cached globs are reused when the
+            # Python directories are expanded into files later on.
+            has_py = p.suffix == ".py" or (
+                p.is_dir() and bool(formatter._cached_glob(p, "**/*.py"))
+            )
+            has_tf = any(
+                formatter._cached_glob(p, f"**/*{suffix}")
+                for suffix in _TF_FMT_SUFFIXES
+            )
+            if has_py:
+                python_paths.append(p)
+            if has_tf:
+                terraform_paths.append(p)
     else:
         python_paths = formatter.find_python_paths()
         terraform_paths = formatter.find_terraform_paths()
@@ -306,29 +546,28 @@ def main(
     elif format_terraform:
         console.print("\n[yellow]No Terraform code found to format[/yellow]")
 
-    # Display summary
-    console.print("\n" + "=" * 50)
+    # Display summary, built up first and printed in one go
+    summary = ["\n" + "=" * 50]
     if check:
-        console.print("[bold]FORMAT CHECK COMPLETE[/bold]")
+        summary.append("[bold]FORMAT CHECK COMPLETE[/bold]")
     else:
-        console.print("[bold]FORMATTING COMPLETE[/bold]")
+        summary.append("[bold]FORMATTING COMPLETE[/bold]")
 
     # Display errors
     if formatter.errors:
-        console.print(f"\n[bold red]Errors ({len(formatter.errors)}):[/bold red]")
-        for error in formatter.errors:
-            console.print(f"  • {error}")
+        summary.append(f"\n[bold red]Errors ({len(formatter.errors)}):[/bold red]")
+        summary.extend(f"  • {error}" for error in formatter.errors)
 
-    # Exit with appropriate code
     if not success:
-        console.print("\n[bold red]Formatting failed![/bold red]")
-        sys.exit(1)
+        summary.append("\n[bold red]Formatting failed![/bold red]")
+    elif check:
+        summary.append("\n[bold green]All code is properly formatted![/bold green]")
     else:
-        if check:
-            console.print("\n[bold green]All code is properly formatted![/bold green]")
-        else:
-            console.print("\n[bold green]All code has been formatted![/bold green]")
-        sys.exit(0)
+        summary.append("\n[bold green]All code has been formatted![/bold green]")
+    console.print("\n".join(summary))
+
+    # Exit with appropriate code
+    sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
@@ -6,15 +6,32 @@ This script checks for required tools, validates Azure authentication, checks Te
 configuration, and provides installation guidance for missing tools.
 """
 
-import json
+import argparse
+import functools
+import os
 import platform
 import shutil
 import subprocess
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
+
+from _source_files import walk_ext
+
+
+@functools.lru_cache(maxsize=None)
+def _which(cmd: str) -> Optional[str]:
+    """Locate an executable on PATH, caching the result for this run."""
+    return shutil.which(cmd)
+
+
+@functools.lru_cache(maxsize=None)
+def _platform_string() -> str:
+    """Return ``platform.platform()`` lowercased, computed once per run."""
+    return platform.platform().lower()
 
 
 class ToolStatus(Enum):
@@ -40,34 +57,54 @@ class ToolCheck:
 class HealthChecker:
     """Comprehensive system health checker for Azure Terraform development."""
 
-    def __init__(self) -> None:
-        """Initialize the health checker."""
+    # Azure CLI start-up is slow, so its version is looked up once per process.
+    _az_version: Optional[str] = None
+    _az_version_error: str = ""
+
+    def __init__(self, verbose: bool = False) -> None:
+        """Initialize the health checker.
+
+        Args:
+            verbose: Also report versions that need an extra, slow tool call
+        """
+        self.verbose = verbose
         self.is_container = self._detect_container_environment()
         self.platform = platform.system().lower()
         self.results: List[ToolCheck] = []
 
     def _detect_container_environment(self) -> bool:
         """Detect if running inside a container."""
+        # Every probe below is Linux-specific, so other hosts skip them all.
+        if sys.platform != "linux":
+            return False
         try:
-            # Check for common container indicators
-            container_indicators = [
-                Path("/.dockerenv").exists(),
-                self._check_proc_cgroup(),
-                "container" in platform.platform().lower(),
-            ]
+            # Check for common container indicators, cheapest first; any()
+            # stops at the first hit so the slower probes are often skipped.
+            container_indicators = (
+                check()
+                for check in (
+                    lambda: os.path.exists("/.dockerenv"),
+                    lambda: self._proc_file_mentions_container("/proc/1/cgroup"),
+                    lambda: "container" in _platform_string(),
+                )
+            )
             return any(container_indicators)
         except Exception:
             return False
 
-    def _check_proc_cgroup(self) -> bool:
-        """Safely check /proc/1/cgroup for docker indicators."""
+    @staticmethod
+    def _proc_file_mentions_container(path: str) -> bool:
+        """Check the start of a /proc file for container runtime markers.
+
+        Reads at most 4 KB in binary mode; the markers sit near the top and
+        nothing needs decoding.
+        """
         try:
-            cgroup_path = Path("/proc/1/cgroup")
-            if cgroup_path.exists():
-                return "docker" in cgroup_path.read_text()
-            return False
-        except Exception:
+            with open(path, "rb") as handle:
+                head = handle.read(4096)
+        except OSError:
             return False
+        return any(marker in head for marker in (b"docker", b"kubepods", b"containerd"))
 
     def _run_command(
         self, cmd: List[str], capture_output: bool = True
@@ -113,7 +150,7 @@ class HealthChecker:
 
     def check_terraform(self) -> ToolCheck:
         """Check Terraform installation and version."""
-        if not shutil.which("terraform"):
+        if not _which("terraform"):
             install_guide = {
                 "windows": "Install via Chocolatey: choco install terraform",
                 "darwin": "Install via Homebrew: brew install terraform",
@@ -149,7 +186,7 @@ class HealthChecker:
 
     def check_azure_cli(self) -> ToolCheck:
         """Check Azure CLI installation and authentication."""
-        if not shutil.which("az"):
+        if not _which("az"):
             install_guide = {
                 "windows": "Install via MSI: https://aka.ms/installazurecliwindows",
                 "darwin": "Install via Homebrew: brew install azure-cli",
@@ -164,26 +201,31 @@ class HealthChecker:
                 ),
             )
 
-        # Check version
-        exit_code, stdout, stderr = self._run_command(["az", "version"])
-        if exit_code != 0:
-            return ToolCheck(
-                name="Azure CLI",
-                status=ToolStatus.ERROR,
-                message=f"Error checking version: {stderr}",
-            )
+        import json
 
-        try:
-            version_info = json.loads(stdout)
-            version = version_info.get("azure-cli", "unknown")
-        except (json.JSONDecodeError, KeyError):
-            version = "unknown"
-
-        # Check authentication
-        auth_exit_code, auth_stdout, auth_stderr = self._run_command(
-            ["az", "account", "show"]
+        # A successful ``account show`` proves both that the CLI works and that
+        # we are logged in, so only fall back to ``az version`` when it fails.
+        auth_exit_code, auth_stdout, _ = self._run_command(
+            ["az", "account", "show", "--output", "json"]
         )
         if auth_exit_code == 0:
+            try:
+                account = json.loads(auth_stdout)
+                authenticated = bool(account.get("user") or account.get("tenantId"))
+            except (json.JSONDecodeError, AttributeError):
+                authenticated = True
+            version = self._azure_cli_version() if self.verbose else None
+        else:
+            authenticated = False
+            version = self._azure_cli_version()
+            if version is None:
+                return ToolCheck(
+                    name="Azure CLI",
+                    status=ToolStatus.ERROR,
+                    message=f"Error checking version: {self._az_version_error}",
+                )
+
+        if authenticated:
             auth_message = "Authenticated and ready"
         else:
             auth_message = "Not authenticated - run 'az login'"
@@ -195,9 +237,25 @@ class HealthChecker:
             message=auth_message,
         )
 
+    def _azure_cli_version(self) -> Optional[str]:
+        """Return the Azure CLI version, running ``az version`` at most once."""
+        import json
+
+        if HealthChecker._az_version is None and not self._az_version_error:
+            exit_code, stdout, stderr = self._run_command(["az", "version"])
+            if exit_code != 0:
+                HealthChecker._az_version_error = stderr or "az version failed"
+                return None
+            try:
+                version_info = json.loads(stdout)
+                HealthChecker._az_version = version_info.get("azure-cli", "unknown")
+            except (json.JSONDecodeError, AttributeError):
+                HealthChecker._az_version = "unknown"
+        return HealthChecker._az_version
+
     def check_git(self) -> ToolCheck:
         """Check Git installation."""
-        if not shutil.which("git"):
+        if not _which("git"):
             install_guide = {
                 "windows": (
                     "Install via Git for Windows: https://git-scm.com/download/win"
@@ -234,7 +292,7 @@ class HealthChecker:
         """Check Docker/containerization tools."""
         docker_cmd = None
         for cmd in ["docker", "podman"]:
-            if shutil.which(cmd):
+            if _which(cmd):
                 docker_cmd = cmd
                 break
 
@@ -272,7 +330,7 @@ class HealthChecker:
 
     def check_nodejs(self) -> ToolCheck:
         """Check Node.js installation (optional)."""
-        if not shutil.which("node"):
+        if not _which("node"):
             return ToolCheck(
                 name="Node.js",
                 status=ToolStatus.MISSING,
@@ -301,7 +359,7 @@ class HealthChecker:
         vscode_commands = ["code", "code-insiders"]
 
         for cmd in vscode_commands:
-            if shutil.which(cmd):
+            if _which(cmd):
                 exit_code, stdout, stderr = self._run_command([cmd, "--version"])
                 if exit_code == 0:
                     version = stdout.split("\n")[0] if stdout else "unknown"
@@ -331,12 +389,10 @@ class HealthChecker:
                 message="Terraform directory not found",
             )
 
-        # Check for at least one module
-        module_dirs = [
-            d
-            for d in terraform_dir.rglob("*")
-            if d.is_dir() and any(f.suffix == ".tf" for f in d.iterdir())
-        ]
+        # Check for at least one module, in a single pass over the tree
+        module_dirs = {
+            os.path.dirname(path) for path in walk_ext(str(terraform_dir), ".tf")
+        }
 
         if not module_dirs:
             return ToolCheck(
@@ -352,44 +408,74 @@ class HealthChecker:
         )
 
     def run_all_checks(self) -> List[ToolCheck]:
-        """Run all health checks."""
-        self.results = []
+        """Run all health checks.
+
+        The checks are independent and spend most of their time waiting on
+        tool subprocesses, so they run concurrently and the results are
+        gathered back in their usual order.
+        """
+        groups: List[Tuple[str, List[Tuple[str, Callable[[], ToolCheck]]]]] = [
+            (
+                "🔍 Checking required tools...",
+                [
+                    ("Python", self.check_python),
+                    ("Terraform", self.check_terraform),
+                    ("Azure CLI", self.check_azure_cli),
+                    ("Git", self.check_git),
+                ],
+            ),
+            (
+                "🔍 Checking optional tools...",
+                [
+                    ("Container Runtime", self.check_docker),
+                    ("Node.js", self.check_nodejs),
+                    ("VS Code", self.check_vscode),
+                ],
+            ),
+            (
+                "🔍 Checking project configuration...",
+                [("Terraform Config", self.check_terraform_config)],
+            ),
+        ]
 
-        # Required tools
-        print("🔍 Checking required tools...")
-        self.results.extend(
-            [
-                self.check_python(),
-                self.check_terraform(),
-                self.check_azure_cli(),
-                self.check_git(),
-            ]
-        )
+        self.results = []
 
-        # Optional tools
-        print("🔍 Checking optional tools...")
-        self.results.extend(
-            [
-                self.check_docker(),
-                self.check_nodejs(),
-                self.check_vscode(),
-            ]
-        )
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = {
+                name: pool.submit(check)
+                for _, checks in groups
+                for name, check in checks
+            }
 
-        # Project configuration
-        print("🔍 Checking project configuration...")
-        self.results.append(self.check_terraform_config())
+            for message, checks in groups:
+                print(message)
+                for name, _ in checks:
+                    self.results.append(self._collect_result(name, futures[name]))
 
         return self.results
 
+    def _collect_result(self, name: str, future: "Future[ToolCheck]") -> ToolCheck:
+        """Return a check's result, reporting an unexpected failure as an error."""
+        try:
+            return future.result()
+        except Exception as e:
+            return ToolCheck(name=name, status=ToolStatus.ERROR, message=str(e))
+
     def print_summary(self) -> None:
-        """Print a comprehensive summary of all checks."""
-        print("\n" + "=" * 80)
-        print("🏥 AZURE TERRAFORM MODULES - HEALTH CHECK SUMMARY")
-        print("=" * 80)
+        """Print a comprehensive summary of all checks.
+
+        The report is assembled in memory and written with a single call so
+        slow terminals and CI log streams are not flushed line by line.
+        """
+        lines: List[str] = []
+        add = lines.append
+
+        add("\n" + "=" * 80)
+        add("🏥 AZURE TERRAFORM MODULES - HEALTH CHECK SUMMARY")
+        add("=" * 80)
 
-        print(f"\n📍 Environment: {'Container' if self.is_container else 'Local'}")
-        print(f"🖥️  Platform: {platform.system()} {platform.release()}")
+        add(f"\n📍 Environment: {'Container' if self.is_container else 'Local'}")
+        add(f"🖥️  Platform: {platform.system()} {platform.release()}")
 
         # Group results by category
         required_tools = ["Python", "Terraform", "Azure CLI", "Git"]
@@ -402,34 +488,34 @@ class HealthChecker:
         ]
         config_checks = ["Terraform Config"]
 
-        def print_category(title: str, tool_names: List[str]) -> None:
-            print(f"\n{title}")
-            print("-" * len(title))
+        def add_category(title: str, tool_names: List[str]) -> None:
+            add(f"\n{title}")
+            add("-" * len(title))
 
             category_results = [
                 r for r in self.results if any(name in r.name for name in tool_names)
             ]
             if not category_results:
-                print("  No tools in this category")
+                add("  No tools in this category")
                 return
 
             for result in category_results:
                 status_icon = result.status.value.split()[0]
-                print(f"  {status_icon} {result.name}")
+                add(f"  {status_icon} {result.name}")
 
                 if result.version:
-                    print(f"      Version: {result.version}")
+                    add(f"      Version: {result.version}")
                 if result.message:
-                    print(f"      Status: {result.message}")
+                    add(f"      Status: {result.message}")
                 if result.install_guidance and result.status in [
                     ToolStatus.MISSING,
                     ToolStatus.VERSION_ISSUE,
                 ]:
-                    print(f"      Install: {result.install_guidance}")
+                    add(f"      Install: {result.install_guidance}")
 
-        print_category("🔧 REQUIRED TOOLS", required_tools)
-        print_category("⚙️  OPTIONAL TOOLS", optional_tools)
-        print_category("📁 PROJECT CONFIGURATION", config_checks)
+        add_category("🔧 REQUIRED TOOLS", required_tools)
+        add_category("⚙️  OPTIONAL TOOLS", optional_tools)
+        add_category("📁 PROJECT CONFIGURATION", config_checks)
 
         # Overall status
         critical_issues = [
@@ -439,29 +525,29 @@ class HealthChecker:
             and any(name in r.name for name in required_tools)
         ]
 
-        print(f"\n{'='*80}")
+        add(f"\n{'='*80}")
         if not critical_issues:
-            print("🎉 SYSTEM READY FOR AZURE TERRAFORM DEVELOPMENT!")
-            print("   All required tools are available and configured.")
+            add("🎉 SYSTEM READY FOR AZURE TERRAFORM DEVELOPMENT!")
+            add("   All required tools are available and configured.")
         else:
-            print("⚠️  SETUP REQUIRED")
-            print(
+            add("⚠️  SETUP REQUIRED")
+            add(
                 f"   {len(critical_issues)} critical tool(s) need attention "
                 f"before development."
             )
 
-        print("=" * 80)
+        add("=" * 80)
 
         # Next steps
-        print("\n📋 NEXT STEPS:")
+        add("\n📋 NEXT STEPS:")
         if critical_issues:
-            print("1. Install missing required tools (see guidance above)")
-            print("2. Re-run this health check: python scripts/health_check.py")
-            print("3. Follow the getting started guide: docs/getting-started.md")
+            add("1. Install missing required tools (see guidance above)")
+            add("2. Re-run this health check: python scripts/health_check.py")
+            add("3. Follow the getting started guide: docs/getting-started.md")
         else:
-            print("1. Start development with: make setup")
-            print("2. Run validation: make validate")
-            print("3. See available commands: make help")
+            add("1. Start development with: make setup")
+            add("2. Run validation: make validate")
+            add("3. See available commands: make help")
 
         # Environment-specific recommendations
         if not self.is_container:
@@ -469,17 +555,28 @@ class HealthChecker:
                 "Container Runtime" in r.name and r.status == ToolStatus.AVAILABLE
                 for r in self.results
             )
-        if docker_available:
-            print("4. Docker is available for containerized development if needed")
+            if docker_available:
+                add("4. Docker is available for containerized development if needed")
+
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
 
 def main() -> None:
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Check the development environment")
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Report tool versions even when an extra command is needed",
+    )
+    args = parser.parse_args()
+
     try:
         print("🏥 Azure Terraform Modules - System Health Check")
         print("=" * 50)
 
-        checker = HealthChecker()
+        checker = HealthChecker(verbose=args.verbose)
         print("Initializing health checker...")
 
         checker.run_all_checks()
@@ -6,10 +6,18 @@ This script detects which Terraform modules have been modified and runs
 validation tests only for those modules.
 """
 
+import functools
+import os
 import subprocess
 import sys
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Iterator, List, Optional, Set, Tuple
+
+from _module_graph import expand_dependents, load_module_graph
+
+# Directories holding Terraform modules; only files under them can affect one
+_MODULE_ROOTS = ("terraform",)
+_TERRAFORM_PATHSPEC = ["--", *(f"{root}/" for root in _MODULE_ROOTS)]
 
 
 def run_command(cmd: List[str], cwd: Optional[Path] = None) -> Tuple[int, str, str]:
@@ -26,92 +34,183 @@ def run_command(cmd: List[str], cwd: Optional[Path] = None) -> Tuple[int, str, s
         return 1, "", str(e)
 
 
+def _git_names(args: List[str]) -> Iterator[str]:
+    """Run ``git <args> -z`` and yield its NUL-separated output as it arrives.
+
+    Output is read in fixed-size chunks rather than captured whole, so a large
+    change set is never held in memory as one string. Errors yield nothing.
+    """
+    try:
+        process = subprocess.Popen(
+            ["git", args[0], "-z", *args[1:]],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return
+    stdout = process.stdout
+    assert stdout is not None
+
+    with process:
+        pending = b""
+        for chunk in iter(lambda: stdout.read(65536), b""):
+            *names, pending = (pending + chunk).split(b"\0")
+            for name in names:
+                yield os.fsdecode(name)
+        if pending:
+            yield os.fsdecode(pending)
+
+
 def get_changed_files(base_branch: str = "main") -> Set[str]:
-    """Get list of files changed compared to base branch."""
-    all_changed_files = set()
+    """Get list of files changed compared to base branch.
+
+    Uses two git calls: a NUL-delimited diff against the base branch, and one
+    ``git status`` that reports staged, unstaged and untracked files together.
+    Both are consumed while git is still writing, and both are limited to the
+    ``terraform/`` tree by a pathspec so git never reports unrelated files.
+    """
+    all_changed_files: Set[str] = set()
 
     # First, get files changed compared to base branch
-    ret_code, stdout, stderr = run_command(
-        ["git", "diff", "--name-only", f"{base_branch}...HEAD"]
+    all_changed_files.update(
+        name
+        for name in _git_names(
+            ["diff", "--name-only", f"{base_branch}...HEAD", *_TERRAFORM_PATHSPEC]
+        )
+        if name
     )
 
-    if ret_code == 0 and stdout.strip():
-        branch_changes = set(stdout.strip().split("\n"))
-        all_changed_files.update(branch_changes)
-
-    # Also get uncommitted changes (staged and unstaged)
-    ret_code, stdout, stderr = run_command(["git", "diff", "--name-only", "HEAD"])
-    if ret_code == 0 and stdout.strip():
-        unstaged_changes = set(stdout.strip().split("\n"))
-        all_changed_files.update(unstaged_changes)
-
-    # Get staged changes
-    ret_code, stdout, stderr = run_command(["git", "diff", "--name-only", "--cached"])
-    if ret_code == 0 and stdout.strip():
-        staged_changes = set(stdout.strip().split("\n"))
-        all_changed_files.update(staged_changes)
-
-    # Get untracked files that are in terraform/ directory
-    ret_code, stdout, stderr = run_command(
-        ["git", "ls-files", "--others", "--exclude-standard"]
+    # Then uncommitted changes (staged and unstaged) plus untracked files
+    records = _git_names(
+        ["status", "--porcelain=v1", "--untracked-files=all", *_TERRAFORM_PATHSPEC]
     )
-    if ret_code == 0 and stdout.strip():
-        untracked_files = set(stdout.strip().split("\n"))
-        # Only include untracked files that are in terraform directory
-        terraform_untracked = {f for f in untracked_files if f.startswith("terraform/")}
-        all_changed_files.update(terraform_untracked)
+    for record in records:
+        if len(record) < 4:
+            continue
+        status, name = record[:2], record[3:]
+        all_changed_files.add(name)
+        if "R" in status or "C" in status:
+            # Renames and copies are followed by their source path
+            source = next(records, "")
+            if source:
+                all_changed_files.add(source)
 
     return all_changed_files
 
 
-def find_terraform_modules() -> List[Path]:
-    """Find all Terraform modules in the project."""
-    terraform_root = Path("terraform")
-    modules = []
-
-    for tf_file in terraform_root.rglob("main.tf"):
-        module_dir = tf_file.parent
-        # Skip example directories
-        if "examples" not in module_dir.parts:
-            modules.append(module_dir)
-
-    return sorted(modules)
+@functools.lru_cache(maxsize=1)
+def find_terraform_modules() -> Tuple[Path, ...]:
+    """Find all Terraform modules in the project.
+
+    A module is any directory holding a ``main.tf``. Example directories and
+    Terraform/git metadata are pruned without being descended into. The tree
+    does not change during a run, so the walk happens once per process.
+    """
+    skip_dirs = {"examples", ".terraform", ".git"}
+    modules: List[str] = []
+    stack = list(_MODULE_ROOTS)
+
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        stack.append(entry.path)
+                elif entry.name == "main.tf":
+                    # Keep scanning: nested modules under this one still count
+                    modules.append(directory)
+
+    return tuple(sorted(Path(module) for module in modules))
 
 
 def get_affected_modules(changed_files: Set[str]) -> Set[Path]:
-    """Determine which Terraform modules are affected by the changed files."""
+    """Determine which Terraform modules are affected by the changed files.
+
+    Module prefixes (``terraform/foo/``) and changed files are sorted together
+    in one pass. A prefix sorts directly before every path it contains, so a
+    stack of the modules enclosing the current position gives each file's
+    owners, nested modules included, without any per-file lookups. Modules
+    that use an affected module are added from the cached module dependency
+    graph.
+    """
     terraform_modules = find_terraform_modules()
-    affected_modules = set()
+    module_by_str = {module.as_posix(): module for module in terraform_modules}
+    affected_modules: Set[Path] = set()
 
-    for changed_file in changed_files:
-        changed_path = Path(changed_file)
-
-        # Check if the changed file is within a Terraform module
-        for module_path in terraform_modules:
-            try:
-                # Check if the changed file is within this module
-                changed_path.relative_to(module_path)
-                affected_modules.add(module_path)
-            except ValueError:
-                # File is not within this module
-                continue
+    # git reports paths with forward slashes; normalise local ones too
+    entries = sorted(
+        [(f"{name}/", True) for name in module_by_str]
+        + [(name.replace(os.sep, "/"), False) for name in changed_files]
+    )
+    enclosing: List[str] = []
+    marked = 0  # enclosing[:marked] are already known to be affected
+    for path, is_module in entries:
+        while enclosing and not path.startswith(enclosing[-1]):
+            enclosing.pop()
+        marked = min(marked, len(enclosing))
+        if is_module:
+            enclosing.append(path)
+        else:
+            # A file can sit inside nested modules, so every enclosing one counts
+            affected_modules.update(
+                module_by_str[prefix[:-1]] for prefix in enclosing[marked:]
+            )
+            marked = len(enclosing)
+
+    if len(affected_modules) == len(terraform_modules):
+        return affected_modules
+
+    # Modules that consume an affected module through a local source are
+    # affected too, even if none of their own files changed
+    graph = load_module_graph()
+    for name in expand_dependents(graph, (m.as_posix() for m in affected_modules)):
+        module = module_by_str.get(name)
+        if module is not None:
+            affected_modules.add(module)
 
     return affected_modules
 
 
+_TEST_DIR = Path("tests/terraform/modules")
+
+
+def _test_file_name(module_path: Path) -> str:
+    """Name of the test file for a module, e.g. ``test_resource_group_validation.py``."""
+    return f"test_{module_path.name.replace('-', '_')}_validation.py"
+
+
 def get_module_test_file(module_path: Path) -> Path:
     """Get the test file path for a given module."""
     # Convert module path to test file name
     # e.g., terraform/foundation/resource-group -> test_resource_group_validation.py
+    return _TEST_DIR / _test_file_name(module_path)
+
+
+def _xdist_installed() -> bool:
+    """Whether pytest-xdist is importable where the tests run.
+
+    Checked through ``poetry run`` because pytest runs in the Poetry
+    environment, not in the interpreter running this script.
+    """
+    ret_code, _, _ = run_command(["poetry", "run", "python", "-c", "import xdist"])
+    return ret_code == 0
 
-    module_name = module_path.name.replace("-", "_")
-    test_file = f"test_{module_name}_validation.py"
-    test_path = Path("tests/terraform/modules") / test_file
-    return test_path
 
+def run_tests_for_modules(
+    modules: Set[Path], workers: Optional[str] = None, run_slow: bool = False
+) -> bool:
+    """Run tests for the specified modules.
 
-def run_tests_for_modules(modules: Set[Path]) -> bool:
-    """Run tests for the specified modules."""
+    With ``workers`` set, pytest-xdist spreads the tests over that many
+    processes. ``--dist=loadfile`` keeps all of a test file's classes on one
+    worker, so its module-scoped Terraform workspace is still initialized once. Tests marked ``slow`` are
+    skipped unless ``run_slow`` is set.
+    """
     if not modules:
         print("No Terraform modules to test.")
         return True
@@ -123,12 +222,18 @@ def run_tests_for_modules(modules: Set[Path]) -> bool:
     test_files = []
     missing_tests = []
 
+    # One directory listing instead of a stat per module
+    try:
+        existing = set(os.listdir(_TEST_DIR))
+    except OSError:
+        existing = set()
+
     for module in modules:
-        test_file = get_module_test_file(module)
-        if test_file.exists():
-            test_files.append(str(test_file))
+        name = _test_file_name(module)
+        if name in existing:
+            test_files.append(str(_TEST_DIR / name))
         else:
-            missing_tests.append((module, test_file))
+            missing_tests.append((module, _TEST_DIR / name))
 
     if missing_tests:
         print("\nWarning: Missing test files for some modules:")
@@ -141,6 +246,10 @@ def run_tests_for_modules(modules: Set[Path]) -> bool:
 
     # Run pytest on the test files
     cmd = ["poetry", "run", "pytest"] + test_files + ["-v", "-m", "terraform"]
+    if workers:
+        cmd += ["-n", workers, "--dist=loadfile"]
+    if run_slow:
+        cmd.append("--run-slow")
 
     print(f"\nRunning tests: {' '.join(cmd)}")
     ret_code, stdout, stderr = run_command(cmd)
@@ -168,6 +277,16 @@ def main() -> int:
     parser.add_argument(
         "--all", action="store_true", help="Test all modules regardless of changes"
     )
+    parser.add_argument(
+        "--run-slow",
+        action="store_true",
+        help="Also run tests marked slow (implied by --all)",
+    )
+    parser.add_argument(
+        "-n",
+        "--workers",
+        help="pytest-xdist worker count (default: auto when pytest-xdist is installed)",
+    )
 
     args = parser.parse_args()
 
@@ -179,7 +298,7 @@ def main() -> int:
         changed_files = get_changed_files(args.base_branch)
 
         if not changed_files:
-            print("No changed files detected.")
+            print("No changed Terraform files detected.")
             return 0
 
         print(f"Changed files ({len(changed_files)}):")
@@ -192,7 +311,10 @@ def main() -> int:
             print("No Terraform modules affected by changes.")
             return 0
 
-    success = run_tests_for_modules(modules)
+    workers = args.workers or ("auto" if _xdist_installed() else None)
+    success = run_tests_for_modules(
+        modules, workers, run_slow=args.run_slow or args.all
+    )
     return 0 if success else 1
 
 
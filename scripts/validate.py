@@ -6,27 +6,92 @@ This script validates Terraform modules for syntax, security, and formatting.
 Designed to run within the Poetry virtual environment.
 """
 
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import click
+from _module_graph import build_module_graph
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
+from rich.text import Text
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
 
 console = Console()
 
+# A ``module "name" {`` block; such modules depend on more than their providers.
+_MODULE_CALL = re.compile(rb'^\s*module\s+"', re.MULTILINE)
+# Start of a top-level ``terraform {`` settings block
+_TERRAFORM_BLOCK = re.compile(rb"^terraform\s*\{", re.MULTILINE)
+_BRACE = re.compile(rb"[{}]")
+# Files every module must have to count as documented
+_DOC_FILES = ("README.md", "variables.tf", "outputs.tf")
+
+_FMT_COMMAND = ["terraform", "fmt", "-check=true", "-diff=false"]
+
+# JSON report of failed checks only; --soft-fail keeps the exit code for
+# Checkov's own errors rather than for findings.
+_CHECKOV_ARGS = [
+    "--framework",
+    "terraform",
+    "--output",
+    "json",
+    "--quiet",
+    "--compact",
+    "--soft-fail",
+]
+
 
 class TerraformValidator:
     """Validates Terraform modules with multiple checks."""
 
-    def __init__(self, base_path: Path):
+    # Lock file contents seen right after each successful init in this process.
+    _initialized: Dict[Path, bytes] = {}
+
+    def __init__(
+        self,
+        base_path: Path,
+        output: Optional[Console] = None,
+        use_cache: bool = True,
+        progress: Optional[Progress] = None,
+    ):
         self.base_path = base_path
+        self.console = output or console
+        # One live display for the whole run; without it no spinners are shown
+        self.progress = progress
+        # Passing results keyed by module content, so unchanged modules can be
+        # skipped on the next run.
+        self.use_cache = use_cache
+        self._cache_path = base_path / ".validation-cache.json"
+        # Shared provider cache so each module's init links providers from
+        # disk instead of downloading them again.
+        self._plugin_cache = base_path / ".terraform-plugin-cache"
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        # Whether each directory holds .tf files, so find_modules and
+        # validate_module list a directory once between them
+        self._tf_dir_cache: Dict[Path, bool] = {}
+
+    def clear_cache(self) -> None:
+        """Forget directory listings made so far, e.g. after files change."""
+        self._tf_dir_cache.clear()
 
     def validate_module(self, module_path: Path, run_security: bool = True) -> bool:
         """
@@ -39,7 +104,7 @@ class TerraformValidator:
         Returns:
             True if validation passes, False otherwise
         """
-        console.print(
+        self.console.print(
             f"\n[bold blue]Validating module:[/bold blue] "
             f"{module_path.relative_to(self.base_path)}"
         )
@@ -51,16 +116,23 @@ class TerraformValidator:
             self.errors.append(f"No Terraform files found in {module_path}")
             return False
 
+        # Formatting and security checks do not need ``terraform init``, so
+        # they are started now and run while the module is being validated
+        fmt_process = self._spawn(_FMT_COMMAND, cwd=module_path)
+        scan_process = (
+            self._spawn(self._checkov_command(module_path)) if run_security else None
+        )
+
         # Terraform syntax validation
         if not self._validate_terraform_syntax(module_path):
             success = False
 
         # Terraform format check
-        if not self._check_terraform_format(module_path):
+        if not self._check_terraform_format(module_path, fmt_process):
             success = False
 
         # Security scanning with Checkov
-        if run_security and not self._run_security_scan(module_path):
+        if run_security and not self._run_security_scan(module_path, scan_process):
             success = False
 
         # Documentation check
@@ -69,186 +141,680 @@ class TerraformValidator:
 
         return success
 
-    def _has_terraform_files(self, module_path: Path) -> bool:
-        """Check if directory contains Terraform files."""
-        tf_files = list(module_path.glob("*.tf"))
-        return len(tf_files) > 0
+    def validate_modules(
+        self, module_paths: List[Path], run_security: bool = True
+    ) -> List[Tuple[Path, bool]]:
+        """
+        Validate several modules, running independent work concurrently.
 
-    def _validate_terraform_syntax(self, module_path: Path) -> bool:
-        """Run terraform validate on the module."""
-        try:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task("Running terraform validate...", total=None)
-
-                # Initialize Terraform
-                init_result = subprocess.run(
-                    ["terraform", "init", "-backend=false"],
-                    cwd=module_path,
-                    capture_output=True,
-                    text=True,
+        Modules mostly wait on terraform, so several are validated at once in
+        separate processes; each module's output is printed as one block when
+        it finishes. The security scan then runs once for all of them.
+
+        Args:
+            module_paths: Paths to the module directories
+            run_security: Whether to run security scanning
+
+        Returns:
+            ``(module_path, passed)`` pairs in the order given
+        """
+        outcomes: Dict[Path, bool] = {}
+        cache = self._load_cache() if self.use_cache else {}
+        keys = (
+            {path: self._cache_key(path, run_security) for path in module_paths}
+            if self.use_cache
+            else {}
+        )
+        for path in keys:
+            if cache.get(str(path)) == {"key": keys[path], "result": True}:
+                outcomes[path] = True
+                self.console.print(
+                    f"\n[bold blue]Validating module:[/bold blue] "
+                    f"{path.relative_to(self.base_path)}\n"
+                    "  ✅ Unchanged since its last successful validation (cached)"
                 )
+        all_paths = module_paths
+        module_paths = [path for path in module_paths if path not in outcomes]
 
-                if init_result.returncode != 0:
-                    self.errors.append(f"Terraform init failed: {init_result.stderr}")
-                    return False
+        if len(module_paths) == 1:
+            module_path = module_paths[0]
+            outcomes[module_path] = self.validate_module(
+                module_path, run_security=False
+            )
+        elif module_paths:
+            workers = min(os.cpu_count() or 1, len(module_paths))
+            # Workers run without spinners; one task here counts modules done
+            progress = self.progress or Progress(console=self.console, disable=True)
+            task = progress.add_task("Validating modules...", total=len(module_paths))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_validate_one, path, self.base_path, False): path
+                    for path in module_paths
+                }
+                for future in as_completed(futures):
+                    success, errors, warnings, report = future.result()
+                    self.console.print(report, end="")
+                    self.errors.extend(errors)
+                    self.warnings.extend(warnings)
+                    outcomes[futures[future]] = success
+                    progress.advance(task)
+            progress.remove_task(task)
+
+        if run_security and module_paths:
+            for module_path, passed in self._run_batched_security_scan(
+                module_paths
+            ).items():
+                outcomes[module_path] = outcomes[module_path] and passed
+
+        if self.use_cache and module_paths:
+            for path in module_paths:
+                # Keyed afresh: init may have just written the module's lock file
+                key = self._cache_key(path, run_security)
+                cache[str(path)] = {"key": key, "result": outcomes[path]}
+            self._save_cache(cache)
+
+        return [(path, outcomes[path]) for path in all_paths]
+
+    def _cache_key(self, module_path: Path, run_security: bool) -> str:
+        """Hash everything a module's validation result depends on.
+
+        Covers the module's ``.tf`` files, README and dependency lock file,
+        the ``.tf`` files of every local module it calls, directly or through
+        other modules, whether the security scan ran, and the installed
+        terraform and checkov binaries, so a tool upgrade invalidates earlier
+        results.
+        """
+        digest = hashlib.sha256(_tool_fingerprint().encode())
+        digest.update(b"security" if run_security else b"no-security")
+        files = [
+            path
+            for path in (module_path / "README.md", module_path / ".terraform.lock.hcl")
+            if path.exists()
+        ]
+        for directory in _local_modules(module_path):
+            files.extend(sorted(directory.glob("*.tf")))
+        for path in files:
+            data = path.read_bytes()
+            name = os.path.relpath(path, module_path)
+            digest.update(f"\0{name}\0{len(data)}\0".encode())
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _load_cache(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self._cache_path, encoding="utf-8") as handle:
+                cache = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
 
-                # Validate syntax
-                validate_result = subprocess.run(
-                    ["terraform", "validate"],
-                    cwd=module_path,
-                    capture_output=True,
-                    text=True,
+    def _save_cache(self, cache: Dict[str, Dict[str, object]]) -> None:
+        try:
+            tmp_path = self._cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(cache, handle, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            self.console.print(f"[yellow]Could not write validation cache: {e}")
+
+    def _run_batched_security_scan(self, module_paths: List[Path]) -> Dict[Path, bool]:
+        """Run a single Checkov scan over every module and split its findings.
+
+        Checkov reloads its policies on every start, so one invocation with a
+        ``-d`` per module replaces one process per module. Failed checks are
+        attributed back to the module that contains the offending file.
+        """
+        self.console.print("\n[bold blue]Security scan:[/bold blue] Checkov")
+        cmd = ["checkov", *_CHECKOV_ARGS]
+        for module_path in module_paths:
+            cmd += ["-d", str(module_path)]
+
+        try:
+            with self._spinner("Running security scan..."):
+                result = subprocess.run(cmd, capture_output=True, text=True)
+        except FileNotFoundError:
+            self.warnings.append("Checkov not found. Security scanning skipped.")
+            self.console.print(
+                "  ⚠️  Checkov not found. Install with 'pip install checkov'"
+            )
+            return {module_path: False for module_path in module_paths}
+
+        try:
+            if result.returncode != 0:
+                raise ValueError(result.stderr)
+            failed_checks = _failed_checks(result.stdout)
+        except ValueError:
+            self.errors.append(f"Security scan error: {result.stderr}")
+            self.console.print(f"  ❌ Security scan error: {result.stderr}")
+            return {module_path: False for module_path in module_paths}
+
+        owners = {path.resolve(): path for path in module_paths}
+        findings: Dict[Path, int] = dict.fromkeys(module_paths, 0)
+        for check in failed_checks:
+            file_path = Path(check.get("file_abs_path", "")).resolve()
+            for parent in file_path.parents:
+                if parent in owners:
+                    findings[owners[parent]] += 1
+                    break
+
+        outcomes: Dict[Path, bool] = {}
+        for module_path in module_paths:
+            relative_path = module_path.relative_to(self.base_path)
+            count = findings[module_path]
+            if count:
+                self.warnings.append(f"Security scan found issues in {module_path}")
+                self.console.print(
+                    f"  ⚠️  {relative_path}: {count} potential issue(s); "
+                    f"run 'checkov -d {module_path}' for details"
                 )
+            else:
+                self.console.print(f"  ✅ {relative_path}: security scan passed")
+            outcomes[module_path] = not count
+        return outcomes
+
+    @contextlib.contextmanager
+    def _spinner(self, description: str) -> Iterator[None]:
+        """Show ``description`` on the shared progress display while running."""
+        if self.progress is None:
+            yield
+            return
+        task = self.progress.add_task(description, total=None)
+        try:
+            yield
+        finally:
+            self.progress.remove_task(task)
 
-                progress.remove_task(task)
+    def _has_terraform_files(self, module_path: Path) -> bool:
+        """Check if directory contains Terraform files."""
+        if module_path not in self._tf_dir_cache:
+            self._tf_dir_cache[module_path] = _contains_tf_file(module_path)
+        return self._tf_dir_cache[module_path]
+
+    def _validate_terraform_syntax(self, module_path: Path) -> bool:
+        """Run terraform validate on the module."""
+        try:
+            with self._spinner("Running terraform validate..."):
+                # Initialize Terraform, sharing one initialized data directory
+                # between modules that pin the same providers
+                env = self._terraform_env()
+                fingerprint = provider_fingerprint(module_path)
+                lock_file = module_path / ".terraform.lock.hcl"
+                borrowed_lock = False
+                try:
+                    if fingerprint is None:
+                        if not self._init_is_current(module_path):
+                            if not self._terraform_init(module_path, env):
+                                return False
+                            self._remember_init(module_path)
+                    else:
+                        data_dir = self._shared_data_dir(module_path, fingerprint, env)
+                        if data_dir is None:
+                            return False
+                        env["TF_DATA_DIR"] = str(data_dir)
+                        shared_lock = data_dir / ".terraform.lock.hcl"
+                        if not lock_file.exists() and shared_lock.exists():
+                            shutil.copyfile(shared_lock, lock_file)
+                            borrowed_lock = True
+
+                    # Validate syntax
+                    validate_result = subprocess.run(
+                        ["terraform", "validate", "-json"],
+                        cwd=module_path,
+                        capture_output=True,
+                        text=True,
+                        env=env,
+                    )
+                finally:
+                    if borrowed_lock:
+                        lock_file.unlink()
 
             if validate_result.returncode == 0:
-                console.print("  ✅ Terraform syntax validation passed")
+                self.console.print("  ✅ Terraform syntax validation passed")
                 return True
             else:
-                self.errors.append(
-                    f"Terraform validation failed: {validate_result.stderr}"
+                details = (
+                    self._validate_diagnostics(validate_result.stdout)
+                    or validate_result.stderr
                 )
-                console.print("  ❌ Terraform syntax validation failed")
-                console.print(f"     {validate_result.stderr}")
+                self.errors.append(f"Terraform validation failed: {details}")
+                self.console.print("  ❌ Terraform syntax validation failed")
+                self.console.print(f"     {details}")
                 return False
 
         except subprocess.CalledProcessError as e:
             self.errors.append(f"Error running terraform validate: {e}")
-            console.print(f"  ❌ Error running terraform validate: {e}")
+            self.console.print(f"  ❌ Error running terraform validate: {e}")
             return False
         except FileNotFoundError:
             self.errors.append("Terraform command not found. Please install Terraform.")
-            console.print("  ❌ Terraform command not found. Please install Terraform.")
+            self.console.print(
+                "  ❌ Terraform command not found. Please install Terraform."
+            )
             return False
 
-    def _check_terraform_format(self, module_path: Path) -> bool:
-        """Check if Terraform files are properly formatted."""
+    @staticmethod
+    def _validate_diagnostics(output: str) -> str:
+        """Summarise the errors reported by ``terraform validate -json``.
+
+        Returns an empty string when the output is not the expected JSON.
+        """
         try:
-            result = subprocess.run(
-                ["terraform", "fmt", "-check=true", "-diff=false"],
+            report = json.loads(output)
+            diagnostics = report.get("diagnostics", [])
+        except (ValueError, AttributeError):
+            return ""
+
+        messages = []
+        for diagnostic in diagnostics:
+            if diagnostic.get("severity") != "error":
+                continue
+            message = diagnostic.get("summary", "")
+            if diagnostic.get("detail"):
+                message += f": {diagnostic['detail']}"
+            location = diagnostic.get("range")
+            if location:
+                filename = location.get("filename", "")
+                line = location.get("start", {}).get("line", "?")
+                message += f" ({filename}:{line})"
+            messages.append(message)
+        return "\n     ".join(messages)
+
+    @staticmethod
+    def _spawn(
+        cmd: List[str], cwd: Optional[Path] = None
+    ) -> "Optional[subprocess.Popen[str]]":
+        """Start ``cmd`` in the background, or return None if it is not installed.
+
+        The caller collects the result later; a missing tool is reported there.
+        """
+        try:
+            return subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        except FileNotFoundError:
+            return None
+
+    def _terraform_env(self) -> Dict[str, str]:
+        """Environment for terraform calls: shared plugin cache, no prompts."""
+        return {
+            **os.environ,
+            "TF_PLUGIN_CACHE_DIR": str(self._plugin_cache),
+            "TF_IN_AUTOMATION": "1",
+            "CHECKPOINT_DISABLE": "1",
+        }
+
+    def _terraform_init(self, module_path: Path, env: Dict[str, str]) -> bool:
+        """Run ``terraform init`` for the module, recording any failure.
+
+        Inits hold the plugin cache lock, so modules validated in parallel
+        never write the same provider into the shared cache at once.
+        """
+        with plugin_cache_lock(self._plugin_cache):
+            init_result = subprocess.run(
+                [
+                    "terraform",
+                    "init",
+                    "-backend=false",
+                    "-input=false",
+                    "-upgrade=false",
+                    "-get=true",
+                ],
                 cwd=module_path,
                 capture_output=True,
                 text=True,
+                env=env,
             )
+        if init_result.returncode != 0:
+            self.errors.append(f"Terraform init failed: {init_result.stderr}")
+            return False
+        return True
 
-            if result.returncode == 0:
-                console.print("  ✅ Terraform formatting check passed")
+    def _shared_data_dir(
+        self, module_path: Path, fingerprint: str, env: Dict[str, str]
+    ) -> Optional[Path]:
+        """Return an initialized Terraform data directory for ``fingerprint``.
+
+        The first module with a given fingerprint is initialized into a scratch
+        directory that is then renamed into place, so concurrent workers never
+        see a half-written one. Later modules, in this run or the next, reuse it.
+        """
+        data_dir = self._plugin_cache / "init" / fingerprint
+        if (data_dir / "providers").is_dir():
+            return data_dir
+
+        data_dir.parent.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(prefix=f"{fingerprint}-", dir=data_dir.parent))
+        lock_file = module_path / ".terraform.lock.hcl"
+        had_lock = lock_file.exists()
+        try:
+            if not self._terraform_init(
+                module_path, {**env, "TF_DATA_DIR": str(scratch)}
+            ):
+                return None
+            (scratch / "providers").mkdir(exist_ok=True)
+            if had_lock:
+                shutil.copyfile(lock_file, scratch / ".terraform.lock.hcl")
+            elif lock_file.exists():
+                # Keep the lock file with the shared providers, leaving the
+                # module directory as it was
+                os.replace(lock_file, scratch / ".terraform.lock.hcl")
+            try:
+                os.rename(scratch, data_dir)
+            except OSError:
+                pass  # another worker finished the same init first
+            return data_dir
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _init_is_current(self, module_path: Path) -> bool:
+        """Check whether this process already initialized the module.
+
+        The init is reused while its providers are still installed and the
+        dependency lock file is unchanged since then.
+        """
+        seen = self._initialized.get(module_path)
+        if seen is None or not (module_path / ".terraform" / "providers").is_dir():
+            return False
+        return self._read_lock_file(module_path) == seen
+
+    def _remember_init(self, module_path: Path) -> None:
+        self._initialized[module_path] = self._read_lock_file(module_path)
+
+    @staticmethod
+    def _read_lock_file(module_path: Path) -> bytes:
+        try:
+            return (module_path / ".terraform.lock.hcl").read_bytes()
+        except OSError:
+            return b""
+
+    def _check_terraform_format(
+        self,
+        module_path: Path,
+        process: "Optional[subprocess.Popen[str]]" = None,
+    ) -> bool:
+        """Check if Terraform files are properly formatted.
+
+        Args:
+            module_path: Path to the module directory
+            process: An already started ``terraform fmt`` check to collect
+        """
+        try:
+            if process is None:
+                process = subprocess.Popen(
+                    _FMT_COMMAND,
+                    cwd=module_path,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+            process.communicate()
+
+            if process.returncode == 0:
+                self.console.print("  ✅ Terraform formatting check passed")
                 return True
             else:
                 self.warnings.append(
                     f"Terraform files in {module_path} need formatting"
                 )
-                console.print(
+                self.console.print(
                     "  ⚠️  Terraform files need formatting (run 'terraform fmt')"
                 )
                 return False
 
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
             self.warnings.append(f"Could not check Terraform formatting: {e}")
-            console.print(f"  ⚠️  Could not check Terraform formatting: {e}")
+            self.console.print(f"  ⚠️  Could not check Terraform formatting: {e}")
             return False
 
-    def _run_security_scan(self, module_path: Path) -> bool:
-        """Run Checkov security scanning."""
-        try:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task("Running security scan...", total=None)
-
-                result = subprocess.run(
-                    [
-                        "checkov",
-                        "-d",
-                        str(module_path),
-                        "--framework",
-                        "terraform",
-                        "--quiet",
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
+    @staticmethod
+    def _checkov_command(module_path: Path) -> List[str]:
+        return ["checkov", "-d", str(module_path), *_CHECKOV_ARGS]
 
-                progress.remove_task(task)
+    def _run_security_scan(
+        self,
+        module_path: Path,
+        process: "Optional[subprocess.Popen[str]]" = None,
+    ) -> bool:
+        """Run Checkov security scanning.
 
-            if result.returncode == 0:
-                console.print("  ✅ Security scan passed")
-                return True
+        Args:
+            module_path: Path to the module directory
+            process: An already started Checkov scan to collect
+        """
+        try:
+            with self._spinner("Running security scan..."):
+                if process is None:
+                    process = subprocess.Popen(
+                        self._checkov_command(module_path),
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                    )
+                stdout, stderr = process.communicate()
+
+            # With --soft-fail a non-zero exit means Checkov itself failed
+            try:
+                if process.returncode != 0:
+                    raise ValueError(stderr)
+                failed_checks = _failed_checks(stdout)
+            except ValueError:
+                self.errors.append(f"Security scan error: {stderr}")
+                self.console.print(f"  ❌ Security scan error: {stderr}")
+                return False
+
+            if failed_checks:
+                self.warnings.append(f"Security scan found issues in {module_path}")
+                self.console.print(
+                    f"  ⚠️  Security scan found {len(failed_checks)} potential issue(s)"
+                )
+                self.console.print(f"     Run 'checkov -d {module_path}' for details")
+                return False
             else:
-                # Checkov returns non-zero for findings, check if error or findings
-                if "Check:" in result.stdout or "FAILED" in result.stdout:
-                    self.warnings.append(f"Security scan found issues in {module_path}")
-                    console.print("  ⚠️  Security scan found potential issues")
-                    console.print(f"     Run 'checkov -d {module_path}' for details")
-                    return False
-                else:
-                    self.errors.append(f"Security scan error: {result.stderr}")
-                    console.print(f"  ❌ Security scan error: {result.stderr}")
-                    return False
+                self.console.print("  ✅ Security scan passed")
+                return True
 
         except FileNotFoundError:
             self.warnings.append("Checkov not found. Security scanning skipped.")
-            console.print("  ⚠️  Checkov not found. Install with 'pip install checkov'")
+            self.console.print(
+                "  ⚠️  Checkov not found. Install with 'pip install checkov'"
+            )
             return False
         except subprocess.CalledProcessError as e:
             self.errors.append(f"Error running security scan: {e}")
-            console.print(f"  ❌ Error running security scan: {e}")
+            self.console.print(f"  ❌ Error running security scan: {e}")
             return False
 
     def _check_documentation(self, module_path: Path) -> bool:
         """Check if module has proper documentation."""
-        readme_path = module_path / "README.md"
-        variables_path = module_path / "variables.tf"
-        outputs_path = module_path / "outputs.tf"
-
-        issues = []
-
-        # Check for README.md
-        if not readme_path.exists():
-            issues.append("Missing README.md")
-
-        # Check for variables.tf
-        if not variables_path.exists():
-            issues.append("Missing variables.tf")
+        # One directory listing instead of a stat per documentation file
+        try:
+            present = set(os.listdir(module_path))
+        except OSError:
+            present = set()
 
-        # Check for outputs.tf
-        if not outputs_path.exists():
-            issues.append("Missing outputs.tf")
+        issues = [f"Missing {name}" for name in _DOC_FILES if name not in present]
 
         if issues:
             self.warnings.extend([f"{module_path}: {issue}" for issue in issues])
-            console.print(f"  ⚠️  Documentation issues: {', '.join(issues)}")
+            self.console.print(f"  ⚠️  Documentation issues: {', '.join(issues)}")
             return False
         else:
-            console.print("  ✅ Documentation check passed")
+            self.console.print("  ✅ Documentation check passed")
             return True
 
     def find_modules(self, terraform_dir: Path) -> List[Path]:
         """Find all Terraform modules in the terraform directory."""
-        modules: List[Path] = []
-
         if not terraform_dir.exists():
-            console.print(
+            self.console.print(
                 f"[yellow]Warning:[/yellow] Terraform directory {terraform_dir} "
                 f"does not exist"
             )
-            return modules
+            return []
 
-        # Look for directories containing .tf files
-        for path in terraform_dir.rglob("*"):
-            if path.is_dir() and self._has_terraform_files(path):
-                # Skip example directories for now
-                if "examples" not in path.parts:
-                    modules.append(path)
+        return sorted(self.iter_modules(terraform_dir))
 
-        return sorted(modules)
+    def iter_modules(self, terraform_dir: Path) -> Iterator[Path]:
+        """Yield Terraform modules under ``terraform_dir`` as the walk finds them.
+
+        Modules come in no particular order; use ``find_modules`` for a sorted
+        list. Each directory is listed once, both to find its subdirectories
+        and to spot a .tf file, and the verdict is kept for validate_module.
+        """
+        stack = [terraform_dir]
+        while stack:
+            directory = stack.pop()
+            has_tf = False
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip example directories for now
+                            if entry.name != "examples":
+                                stack.append(Path(entry.path))
+                        elif not has_tf and entry.name.endswith(".tf"):
+                            has_tf = entry.is_file()
+            except OSError:
+                continue
+            self._tf_dir_cache[directory] = has_tf
+            if has_tf and directory != terraform_dir:
+                yield directory
+
+
+def _contains_tf_file(directory: Path) -> bool:
+    """Check for a ``.tf`` file, stopping at the first one.
+
+    The directory entries carry their file type, so regular files need no
+    ``stat`` call; only symlinks are resolved.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return any(
+                entry.name.endswith(".tf") and entry.is_file() for entry in entries
+            )
+    except OSError:
+        return False
+
+
+def _local_modules(module_path: Path) -> List[Path]:
+    """Return ``module_path`` and every local module it calls, transitively."""
+    modules = [module_path]
+    seen = {module_path.as_posix()}
+    for directory in modules:
+        graph = build_module_graph([str(path) for path in directory.glob("*.tf")])
+        for dependency in graph.get(directory.as_posix(), ()):
+            if dependency not in seen and os.path.isdir(dependency):
+                seen.add(dependency)
+                modules.append(Path(dependency))
+    return modules
+
+
+@contextlib.contextmanager
+def plugin_cache_lock(cache_dir: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the plugin cache, across processes.
+
+    Terraform does not guard the cache against concurrent writers, so inits
+    that may download into it (from parallel validation or pytest-xdist
+    workers) take turns. Where ``fcntl`` is unavailable the lock is a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _terraform_blocks(data: bytes) -> Iterator[bytes]:
+    """Yield each top-level ``terraform { ... }`` block in an HCL file."""
+    for match in _TERRAFORM_BLOCK.finditer(data):
+        depth = 0
+        for brace in _BRACE.finditer(data, match.end() - 1):
+            depth += 1 if brace.group() == b"{" else -1
+            if depth == 0:
+                yield data[match.start() : brace.end()]
+                break
+
+
+def provider_fingerprint(module_path: Path) -> Optional[str]:
+    """Hash what decides which providers ``terraform init`` installs.
+
+    That is every ``terraform { ... }`` block in the module's ``.tf`` files,
+    whichever file holds it, plus the dependency lock file. Modules that call
+    other modules keep their own ``.terraform`` (it also records the child
+    module sources), and modules without ``required_providers`` get providers
+    inferred from their resources; neither kind gets a fingerprint.
+    """
+    digest = hashlib.sha256()
+    declares_providers = False
+    for tf_file in sorted(module_path.glob("*.tf")):
+        data = tf_file.read_bytes()
+        if _MODULE_CALL.search(data):
+            return None
+        for block in _terraform_blocks(data):
+            declares_providers = declares_providers or b"required_providers" in block
+            digest.update(block + b"\0")
+    if not declares_providers:
+        return None
+    lock_file = module_path / ".terraform.lock.hcl"
+    if lock_file.exists():
+        digest.update(b".terraform.lock.hcl\0" + lock_file.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_fingerprint() -> str:
+    """Identify the installed terraform and checkov builds without running them.
+
+    Asking checkov for its version costs seconds, while the resolved binary
+    path and its size and mtime change whenever either tool is upgraded.
+    """
+    parts = []
+    for tool in ("terraform", "checkov"):
+        location = shutil.which(tool)
+        if location is None:
+            parts.append(f"{tool}:missing")
+            continue
+        stat = os.stat(location)
+        parts.append(f"{tool}:{location}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def _failed_checks(output: str) -> List[Dict[str, Any]]:
+    """Collect the failed checks from Checkov's JSON output.
+
+    Checkov prints one report object per framework, or a list of them; empty
+    output means there was nothing to scan. Raises ValueError if the output
+    is not JSON.
+    """
+    reports = json.loads(output) if output.strip() else []
+    failed: List[Dict[str, Any]] = []
+    for report in reports if isinstance(reports, list) else [reports]:
+        failed.extend(report.get("results", {}).get("failed_checks", []))
+    return failed
+
+
+def _validate_one(
+    module_path: Path, base_path: Path, run_security: bool
+) -> Tuple[bool, List[str], List[str], Text]:
+    """Validate one module in a worker process.
+
+    A fresh validator keeps workers free of shared state, and its console
+    output is recorded rather than printed so that concurrently running
+    modules do not interleave on stdout. The parent prints it afterwards.
+    """
+    output = Console(file=io.StringIO(), record=True, width=console.width)
+    validator = TerraformValidator(base_path, output=output)
+    success = validator.validate_module(module_path, run_security=run_security)
+    report = Text.from_ansi(output.export_text(styles=True))
+    return success, validator.errors, validator.warnings, report
 
 
 @click.command()
@@ -268,13 +834,22 @@ class TerraformValidator:
     default=True,
     help="Run security scanning (default: enabled)",
 )
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Skip modules unchanged since they last passed (default: enabled)",
+)
 @click.option(
     "--format/--no-format",
     default=True,
     help="Check Terraform formatting (default: enabled)",
 )
 def main(
-    module: Optional[str], validate_all: bool, security: bool, format: bool
+    module: Optional[str],
+    validate_all: bool,
+    security: bool,
+    cache: bool,
+    format: bool,
 ) -> None:
     """
     Validate Terraform modules for syntax, security, and best practices.
@@ -283,12 +858,19 @@ def main(
         python scripts/validate.py --module terraform/foundation/resource-group
         python scripts/validate.py --all
         python scripts/validate.py --all --no-security
+        python scripts/validate.py --all --no-cache
     """
     base_path = Path.cwd()
-    validator = TerraformValidator(base_path)
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True,
+    )
+    validator = TerraformValidator(base_path, use_cache=cache, progress=progress)
 
     # Convert string module path to Path object if provided
-    module_path = Path(module) if module else None
+    module_path = Path(module).resolve() if module else None
 
     console.print(
         Panel.fit(
@@ -320,10 +902,8 @@ def main(
     )
 
     # Validate modules
-    results = []
-    for module_path in modules_to_validate:
-        result = validator.validate_module(module_path, run_security=security)
-        results.append((module_path, result))
+    with progress:
+        results = validator.validate_modules(modules_to_validate, run_security=security)
 
     # Display summary
     console.print("\n" + "=" * 60)
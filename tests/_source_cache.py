@@ -0,0 +1,42 @@
+"""
+Shared, read-once cache of module file contents for the content tests.
+"""
+
+import functools
+import os
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+# Text sources the content tests read; anything else, e.g. a .DS_Store, is
+# never decoded
+_TEXT_SUFFIXES = (".tf", ".hcl", ".md")
+
+
+def module_sources(module_path: Path) -> Mapping[str, str]:
+    """Return the text of every source file directly in ``module_path``, by name.
+
+    Contents are cached for the rest of the session, keyed by the directory
+    and the name, mtime and size of each file, so a file that changes is
+    read again while unchanged modules cost one directory listing.
+    """
+    listing = []
+    with os.scandir(module_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(_TEXT_SUFFIXES) and entry.is_file():
+                stat = entry.stat()
+                listing.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return _read_sources(str(module_path), tuple(sorted(listing)))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_sources(
+    module_path: str, listing: Tuple[Tuple[str, int, int], ...]
+) -> Mapping[str, str]:
+    """Read the files in ``listing``; the result must not be modified."""
+    return MappingProxyType(
+        {
+            name: Path(module_path, name).read_text(encoding="utf-8")
+            for name, _, _ in listing
+        }
+    )
@@ -2,11 +2,20 @@
 Test configuration for pytest.
 """
 
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import uuid
 from pathlib import Path
-from typing import Any
+from typing import Any, FrozenSet, Iterator, List, Optional
 
 import pytest
 
+# Make the scripts importable by their tests (``from validate import ...``)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+
 
 def pytest_configure(config: Any) -> None:
     """Configure pytest with custom markers."""
@@ -23,6 +32,52 @@ def pytest_configure(config: Any) -> None:
         "markers", "terraform_apply: Tests that actually deploy to Azure (dangerous)"
     )
 
+    # Tight local loops can skip writing the pytest cache; reads still work
+    cache = getattr(config, "cache", None)
+    if cache is not None and os.getenv("TF_TESTS_NO_CACHE", "false").lower() in (
+        "1",
+        "true",
+    ):
+        cache.set = lambda key, value: None
+
+
+def pytest_addoption(parser: Any) -> None:
+    """Add command line options."""
+    parser.addoption(
+        "--run-slow",
+        action="store_true",
+        default=False,
+        help="run tests marked slow (skipped by default to keep PR runs fast)",
+    )
+
+
+def pytest_collection_modifyitems(config: Any, items: List[pytest.Item]) -> None:
+    """Skip tests marked slow unless --run-slow is given."""
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test; use --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+# Tests that drive the Terraform CLI; nothing else in them runs without it
+TERRAFORM_MODULE_TESTS = Path(__file__).parent / "terraform" / "modules"
+
+
+def pytest_ignore_collect(collection_path: Path, config: Any) -> Optional[bool]:
+    """Don't collect the Terraform module tests when they would all be skipped.
+
+    Their modules are then never imported. Test files named on the command
+    line are still collected, and skipped as before.
+    """
+    if collection_path != TERRAFORM_MODULE_TESTS:
+        return None
+
+    from tests.terraform.config import TerraformTestConfig
+
+    return True if TerraformTestConfig.should_skip_terraform_tests() else None
+
 
 @pytest.fixture
 def project_root() -> Path:
@@ -30,11 +85,14 @@ def project_root() -> Path:
     return Path.cwd()
 
 
-@pytest.fixture
-def sample_terraform_module(tmp_path: Path) -> Path:
-    """Fixture creating a sample Terraform module for testing."""
-    module_dir = tmp_path / "sample-module"
-    module_dir.mkdir()
+@pytest.fixture(scope="session")
+def sample_terraform_module(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Fixture creating a sample Terraform module for testing.
+
+    The module is written once per session and shared, so tests must not
+    modify it; use ``mutable_sample_terraform_module`` for that.
+    """
+    module_dir = tmp_path_factory.mktemp("sample-module")
 
     # Create basic Terraform files
     (module_dir / "main.tf").write_text(
@@ -109,10 +167,35 @@ module "example" {
 
 
 @pytest.fixture
-def sample_python_files(tmp_path: Path) -> Path:
-    """Fixture creating sample Python files for testing."""
-    python_dir = tmp_path / "python_code"
-    python_dir.mkdir()
+def fast_tmp_path(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """Like ``tmp_path``, but cheaper to create and removed after the test.
+
+    The directory gets a random name instead of the next ``<test>N`` number,
+    which pytest finds by listing every directory created so far.
+    """
+    path = tmp_path_factory.mktemp(uuid.uuid4().hex[:12], numbered=False)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def mutable_sample_terraform_module(
+    sample_terraform_module: Path, fast_tmp_path: Path
+) -> Path:
+    """Fixture providing a private copy of the sample module to modify."""
+    module_dir = fast_tmp_path / "sample-module"
+    shutil.copytree(sample_terraform_module, module_dir)
+    return module_dir
+
+
+@pytest.fixture(scope="session")
+def sample_python_files(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Fixture creating sample Python files for testing.
+
+    The files are written once per session and shared, so tests must not
+    modify them; use ``mutable_sample_python_files`` for that.
+    """
+    python_dir = tmp_path_factory.mktemp("python_code")
 
     # Create a sample Python file with formatting issues
     (python_dir / "sample.py").write_text(
@@ -140,6 +223,14 @@ class BadlyFormattedClass:
     return python_dir
 
 
+@pytest.fixture
+def mutable_sample_python_files(sample_python_files: Path, fast_tmp_path: Path) -> Path:
+    """Fixture providing a private copy of the sample Python files to modify."""
+    python_dir = fast_tmp_path / "python_code"
+    shutil.copytree(sample_python_files, python_dir)
+    return python_dir
+
+
 @pytest.fixture
 def terraform_resource_group_module(project_root: Path) -> Path:
     """Fixture providing the path to the resource group Terraform module."""
@@ -169,3 +260,96 @@ def skip_terraform_if_unavailable(terraform_available):
         pytest.skip(
             f"Skipping Terraform tests: {TerraformTestConfig.get_skip_reason()}"
         )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def terraform_cli_environment() -> Iterator[None]:
+    """Auto-fixture running Terraform non-interactively with a shared plugin cache.
+
+    Every workspace's ``terraform init`` links providers from the one cache
+    instead of unpacking them again. An existing ``TF_PLUGIN_CACHE_DIR`` wins.
+    """
+    from tests.terraform.base_validation import PLUGIN_CACHE_DIR
+
+    with pytest.MonkeyPatch.context() as patch:
+        cache_dir = Path(os.environ.get("TF_PLUGIN_CACHE_DIR", PLUGIN_CACHE_DIR))
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        patch.setenv("TF_PLUGIN_CACHE_DIR", str(cache_dir))
+        # Workspaces start without a lock file; without this, Terraform 1.4+
+        # downloads providers again instead of using the cache
+        patch.setenv("TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE", "1")
+        patch.setenv("TF_IN_AUTOMATION", "1")
+        patch.setenv("TF_INPUT", "0")
+        yield
+
+
+def _tf_tree_key(terraform: str, root: Path) -> str:
+    """Key that changes when terraform or any ``.tf`` file under ``root`` does."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{terraform}\0{os.stat(terraform).st_mtime_ns}\0".encode())
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != ".terraform")
+        for name in sorted(filenames):
+            if name.endswith(".tf"):
+                stat = os.stat(os.path.join(dirpath, name))
+                digest.update(
+                    f"{dirpath}/{name}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode()
+                )
+    return digest.hexdigest()
+
+
+@pytest.fixture(scope="session")
+def terraform_result_cache(request: pytest.FixtureRequest) -> Optional[pytest.Cache]:
+    """The pytest cache, for passing Terraform results kept between sessions.
+
+    None with ``-p no:cacheprovider``; with ``TF_TESTS_NO_CACHE`` set it is
+    still read but never written.
+    """
+    return getattr(request.config, "cache", None)
+
+
+@pytest.fixture(scope="session")
+def terraform_fmt_results(request: pytest.FixtureRequest) -> FrozenSet[Path]:
+    """Fixture listing every unformatted ``.tf`` file under ``terraform/``.
+
+    ``terraform fmt -check`` runs once over the whole tree; formatting tests
+    look their module or example up in the result. The result is kept in the
+    pytest cache, so later sessions skip fmt until a ``.tf`` file changes.
+    """
+    from tests.terraform.config import (
+        TerraformTestConfig,
+        get_terraform_modules_path,
+        get_terraform_path,
+    )
+
+    if TerraformTestConfig.should_skip_terraform_tests():
+        pytest.skip(TerraformTestConfig.get_skip_reason())
+
+    modules_root = get_terraform_modules_path().resolve()
+    terraform = get_terraform_path()
+    cache = getattr(request.config, "cache", None)  # None with -p no:cacheprovider
+    key = _tf_tree_key(terraform, modules_root)
+    cached = cache.get("terraform/fmt", None) if cache is not None else None
+
+    if cached and cached.get("key") == key:
+        names = cached["unformatted"]
+    else:
+        result = subprocess.run(
+            [terraform, "fmt", "-check", "-recursive", "-list=true"],
+            cwd=modules_root,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        # Unformatted files only make fmt exit non-zero; errors also go to stderr
+        if result.returncode != 0 and result.stderr.strip():
+            pytest.fail(f"terraform fmt failed: {result.stderr}")
+        names = [
+            name
+            for name in result.stdout.splitlines()
+            if name and ".terraform" not in Path(name).parts
+        ]
+        if cache is not None:
+            cache.set("terraform/fmt", {"key": key, "unformatted": names})
+
+    return frozenset(modules_root / name for name in names)
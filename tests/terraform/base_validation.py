@@ -5,17 +5,100 @@ This module provides testing capabilities that work without Azure authentication
 by focusing on syntax validation, structure checking, and static analysis.
 """
 
+import atexit
+import contextlib
+import functools
+import hashlib
 import json
 import logging
+import os
 import re
 import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import pytest
+
+from scripts.validate import plugin_cache_lock, provider_fingerprint
+from tests.terraform.config import (
+    get_terraform_modules_path,
+    get_terraform_path,
+    get_terraform_version,
+    get_tflint_path,
+)
 
 logger = logging.getLogger(__name__)
 
+PLUGIN_CACHE_DIR = get_terraform_modules_path().parent / ".terraform-plugin-cache"
+
+# Variables are written as terraform.tfvars.json; in HCL files, maps and lists
+# are written as JSON too, which HCL accepts as-is
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+# HCL literal for each exact value type, for generated .tftest.hcl files;
+# keyed by type() so bool is never mistaken for int
+_TFVARS_FORMATTERS: Dict[type, Callable[[Any], str]] = {
+    str: lambda value: f'"{value}"',
+    bool: lambda value: "true" if value else "false",
+    int: str,
+    float: str,
+    dict: _encode_json,
+    list: _encode_json,
+}
+
+
+# Local module calls that climb out of the calling directory
+_PARENT_SOURCE_RE = re.compile(rb'source\s*=\s*"((?:\.\./)+)')
+
+
+def _source_root(module_path: Path) -> Path:
+    """Highest directory a module reaches through ``source = "../..."`` calls."""
+    depth = 0
+    with os.scandir(module_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".tf") and entry.is_file():
+                with open(entry.path, "rb") as handle:
+                    for climb in _PARENT_SOURCE_RE.findall(handle.read()):
+                        depth = max(depth, climb.count(b"../"))
+    if not depth:
+        return module_path
+    return module_path.resolve().parents[depth - 1]
+
+
+def _ignore_non_terraform(directory: str, names: List[str]) -> List[str]:
+    """``shutil.copytree`` filter keeping only Terraform sources and folders."""
+    return [
+        name
+        for name in names
+        if name.startswith(".terraform")
+        or not (
+            name.endswith((".tf", ".tfvars"))
+            or os.path.isdir(os.path.join(directory, name))
+        )
+    ]
+
+
+def _link_or_copy(src: str, dest: Path) -> None:
+    """Hard-link ``src`` to ``dest``, copying when linking is not possible."""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)  # e.g. a temp dir on another device
+
 
 class TerraformValidationTest:
     """
@@ -32,6 +115,7 @@ class TerraformValidationTest:
         """Initialize with path to Terraform module."""
         self.module_path = Path(module_path)
         self.test_dir: Optional[Path] = None
+        self._workspace_root: Optional[Path] = None
         self.terraform_cmd = self._find_terraform()
 
         if not self.terraform_cmd:
@@ -42,8 +126,7 @@ class TerraformValidationTest:
 
     def _find_terraform(self) -> Optional[str]:
         """Find terraform executable in PATH."""
-        result = subprocess.run(["which", "terraform"], capture_output=True, text=True)
-        return result.stdout.strip() if result.returncode == 0 else None
+        return get_terraform_path()
 
     def __enter__(self):
         """Context manager entry."""
@@ -56,33 +139,52 @@ class TerraformValidationTest:
     def cleanup(self):
         """Clean up temporary test directory."""
         if self.test_dir and self.test_dir.exists():
-            shutil.rmtree(self.test_dir, ignore_errors=True)
-            self.test_dir = None
+            shutil.rmtree(self._workspace_root or self.test_dir, ignore_errors=True)
+        self.test_dir = None
+        self._workspace_root = None
 
     def setup_test_workspace(self):
-        """Set up test workspace with module files."""
+        """Set up test workspace with module files.
+
+        A module that calls a parent directory (``source = "../../"``), such as
+        an example, is placed at the same relative position inside a linked
+        copy of that directory, so the call still resolves.
+        """
         if self.test_dir:
             self.cleanup()
 
         self.test_dir = Path(tempfile.mkdtemp(prefix="terraform-validation-"))
         logger.info(f"Created test workspace: {self.test_dir}")
 
-        # Copy module files
-        for item in self.module_path.iterdir():
-            if item.is_file() and item.suffix in [".tf", ".tfvars"]:
-                dest = self.test_dir / item.name
-                shutil.copy2(item, dest)
-                logger.debug(f"Copied {item} to {dest}")
+        source_root = _source_root(self.module_path)
+        if source_root != self.module_path:
+            self._workspace_root = self.test_dir
+            shutil.copytree(
+                source_root,
+                self.test_dir,
+                ignore=_ignore_non_terraform,
+                copy_function=_link_or_copy,
+                dirs_exist_ok=True,
+            )
+            self.test_dir = self.test_dir / self.module_path.relative_to(source_root)
+            return
+
+        # Link module files rather than copying them; files the test rewrites
+        # are replaced, never written through (see _write_workspace_file)
+        with os.scandir(self.module_path) as entries:
+            for entry in entries:
+                if entry.name.endswith((".tf", ".tfvars")) and entry.is_file():
+                    dest = self.test_dir / entry.name
+                    _link_or_copy(entry.path, dest)
+                    logger.debug(f"Linked {entry.path} to {dest}")
 
     def create_minimal_config(self, variables: Dict[str, Any]):
         """Create minimal test configuration for validation."""
         if not self.test_dir:
             raise RuntimeError("Test workspace not set up")
 
-        # Create terraform.tfvars
-        tfvars_content = self._generate_tfvars(variables)
-        tfvars_file = self.test_dir / "terraform.tfvars"
-        tfvars_file.write_text(tfvars_content)
+        # Create terraform.tfvars.json
+        self.use_variables(variables)
 
         # Create versions.tf for provider requirements only
         versions_content = """terraform {
@@ -94,43 +196,95 @@ class TerraformValidationTest:
     }
   }
 }"""
-        versions_file = self.test_dir / "versions.tf"
-        versions_file.write_text(versions_content)
-
-    def _generate_tfvars(self, variables: Dict[str, Any]) -> str:
-        """Generate terraform.tfvars content."""
-        lines = []
-        for key, value in variables.items():
-            if isinstance(value, str):
-                lines.append(f'{key} = "{value}"')
-            elif isinstance(value, bool):
-                lines.append(f"{key} = {str(value).lower()}")
-            elif isinstance(value, (dict, list)):
-                formatted_value = json.dumps(value)
-                lines.append(f"{key} = {formatted_value}")
-            else:
-                lines.append(f"{key} = {value}")
-
-        return "\n".join(lines) + "\n"
-
-    def _run_terraform_command(self, args: List[str]) -> Tuple[int, str, str]:
-        """Run terraform command and return result."""
+        self._write_workspace_file("versions.tf", versions_content)
+
+    def reset_state(self):
+        """Remove tfvars, state, plans and generated tests from the workspace.
+
+        Module files and the ``.terraform`` directory are kept, so the
+        workspace stays initialized for the next configuration.
+        """
+        if not self.test_dir:
+            raise RuntimeError("Test workspace not set up")
+
+        for pattern in ("terraform.tfvars.json", "terraform.tfstate*", "tfplan"):
+            for path in self.test_dir.glob(pattern):
+                path.unlink()
+        shutil.rmtree(self.test_dir / "tests", ignore_errors=True)
+
+    def use_variables(self, variables: Dict[str, Any]):
+        """Replace the workspace's terraform.tfvars.json with ``variables``.
+
+        Nothing else in the workspace changes, so an initialized workspace can
+        be validated against many configurations without another init.
+        """
+        self._write_workspace_file("terraform.tfvars.json", _encode_json(variables))
+
+    def _write_workspace_file(self, name: str, content: str):
+        """Write a workspace file without touching the module's copy of it.
+
+        Module files are hard links into the module directory, so an existing
+        file is unlinked first instead of being overwritten in place.
+        """
+        if not self.test_dir:
+            raise RuntimeError("Test workspace not set up")
+
+        path = self.test_dir / name
+        path.unlink(missing_ok=True)
+        path.write_text(content)
+
+    @staticmethod
+    def _tfvars_value(value: Any) -> str:
+        """Render one value as an HCL literal."""
+        formatter = _TFVARS_FORMATTERS.get(type(value))
+        if formatter is not None:
+            return formatter(value)
+
+        # Subclasses of the common types
+        if isinstance(value, str):
+            return f'"{value}"'
+        if isinstance(value, bool):
+            return str(value).lower()
+        if isinstance(value, (dict, list)):
+            return _encode_json(value)
+        return str(value)
+
+    def _run_terraform_command(
+        self, args: List[str], keep_output: bool = False
+    ) -> Tuple[int, str, str]:
+        """Run terraform command and return result.
+
+        Output is only decoded when the command fails, or when ``keep_output``
+        is set; otherwise successful commands return empty stdout and stderr.
+        """
         if not self.test_dir:
             raise RuntimeError("Test workspace not set up")
 
         cmd = [self.terraform_cmd] + args
         logger.debug(f"Running: {' '.join(cmd)} in {self.test_dir}")
 
+        # Share downloaded providers between workspaces, and with
+        # scripts/validate.py, unless the user set their own cache
+        env = dict(os.environ)
+        env.setdefault("TF_PLUGIN_CACHE_DIR", str(PLUGIN_CACHE_DIR))
+        Path(env["TF_PLUGIN_CACHE_DIR"]).mkdir(parents=True, exist_ok=True)
+
         try:
             result = subprocess.run(
                 cmd,
                 cwd=self.test_dir,
                 capture_output=True,
-                text=True,
                 timeout=120,  # 2 minute timeout
+                env=env,
             )
 
-            return result.returncode, result.stdout, result.stderr
+            if result.returncode == 0 and not keep_output:
+                return 0, "", ""
+            return (
+                result.returncode,
+                result.stdout.decode(errors="replace"),
+                result.stderr.decode(errors="replace"),
+            )
 
         except subprocess.TimeoutExpired as e:
             raise RuntimeError(f"Terraform command timed out: {' '.join(cmd)}") from e
@@ -138,8 +292,97 @@ class TerraformValidationTest:
             raise RuntimeError(f"Failed to run terraform command: {e}") from e
 
     def terraform_init_backend_false(self) -> Tuple[int, str, str]:
-        """Run terraform init with -backend=false to avoid state/provider issues."""
-        return self._run_terraform_command(["init", "-backend=false", "-no-color"])
+        """Run terraform init with -backend=false to avoid state/provider issues.
+
+        A workspace that pins the same providers as an earlier init, in this
+        run or a previous one, gets a linked copy of that init's ``.terraform``
+        directory and lock file instead, and runs no init at all.
+        """
+        fingerprint = provider_fingerprint(self.test_dir) if self.test_dir else None
+        snapshot = None
+        if fingerprint is not None:
+            cache_dir = Path(os.environ.get("TF_PLUGIN_CACHE_DIR", PLUGIN_CACHE_DIR))
+            snapshot = cache_dir / "init" / fingerprint
+            if self._restore_init(snapshot):
+                return 0, "", ""
+
+        result = self._terraform_init()
+        if result[0] == 0 and snapshot is not None:
+            self._save_init(snapshot)
+        return result
+
+    def _terraform_init(self) -> Tuple[int, str, str]:
+        """Run ``terraform init -backend=false`` in the workspace.
+
+        Once the plugin cache holds providers, init first installs from it as
+        a local plugin directory, which skips every registry request. Only if
+        that fails, e.g. on a version the cache lacks, does init go online.
+        Online inits hold the plugin cache lock, and retry the cache once they
+        have it, so parallel workspaces download each provider only once.
+        """
+        args = ["init", "-backend=false", "-no-color"]
+        cache_dir = Path(os.environ.get("TF_PLUGIN_CACHE_DIR", PLUGIN_CACHE_DIR))
+
+        def init_from_cache() -> Optional[Tuple[int, str, str]]:
+            if not cache_dir.is_dir() or all(
+                entry.name == ".lock" for entry in cache_dir.iterdir()
+            ):
+                return None
+            result = self._run_terraform_command([*args, f"-plugin-dir={cache_dir}"])
+            return result if result[0] == 0 else None
+
+        result = init_from_cache()
+        if result is not None:
+            return result
+        with plugin_cache_lock(cache_dir):
+            # Another process may have filled the cache while this one waited
+            return init_from_cache() or self._run_terraform_command(args)
+
+    def _restore_init(self, snapshot: Path) -> bool:
+        """Link a saved init into the workspace; False if there is none."""
+        if not self.test_dir or not (snapshot / "providers").is_dir():
+            return False
+        shutil.copytree(
+            snapshot,
+            self.test_dir / ".terraform",
+            symlinks=True,
+            ignore=shutil.ignore_patterns(".terraform.lock.hcl"),
+            copy_function=_link_or_copy,
+            dirs_exist_ok=True,
+        )
+        lock_file = self.test_dir / ".terraform.lock.hcl"
+        if not lock_file.exists() and (snapshot / lock_file.name).exists():
+            shutil.copyfile(snapshot / lock_file.name, lock_file)
+        return True
+
+    def _save_init(self, snapshot: Path):
+        """Keep the workspace's init for later workspaces with its providers.
+
+        The copy is made in a scratch directory and renamed into place, so a
+        concurrent reader never sees a partial one.
+        """
+        if not self.test_dir or snapshot.exists():
+            return
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        scratch = Path(
+            tempfile.mkdtemp(prefix=f"{snapshot.name}-", dir=snapshot.parent)
+        )
+        try:
+            shutil.copytree(
+                self.test_dir / ".terraform",
+                scratch,
+                symlinks=True,
+                dirs_exist_ok=True,
+            )
+            (scratch / "providers").mkdir(exist_ok=True)
+            lock_file = self.test_dir / ".terraform.lock.hcl"
+            if lock_file.exists():
+                shutil.copyfile(lock_file, scratch / lock_file.name)
+            os.rename(scratch, snapshot)
+        except OSError:
+            pass  # another process saved the same init first
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
 
     def terraform_validate(self) -> Tuple[int, str, str]:
         """Run terraform validate."""
@@ -149,106 +392,206 @@ class TerraformValidationTest:
         """Check terraform formatting."""
         return self._run_terraform_command(["fmt", "-check", "-no-color"])
 
+    def write_plan_tests(self, name: str, runs: Mapping[str, Dict[str, Any]]):
+        """Write ``tests/<name>.tftest.hcl`` with one plan run per variable set.
+
+        Every provider the module requires is mocked, so the runs plan without
+        credentials while still evaluating variable validation rules.
+        Run names must be valid HCL identifiers.
+        """
+        analyzer = TerraformModuleAnalyzer(self.module_path)
+        providers = analyzer.check_terraform_version_constraints().get("providers", {})
+        blocks = [f'mock_provider "{provider}" {{}}\n' for provider in providers]
+        for run_name, variables in runs.items():
+            assignments = "".join(
+                f"    {key} = {self._tfvars_value(value)}\n"
+                for key, value in variables.items()
+            )
+            blocks.append(
+                f'run "{run_name}" {{\n  command = plan\n\n'
+                f"  variables {{\n{assignments}  }}\n}}\n"
+            )
+
+        if not self.test_dir:
+            raise RuntimeError("Test workspace not set up")
+        (self.test_dir / "tests").mkdir(exist_ok=True)
+        self._write_workspace_file(f"tests/{name}.tftest.hcl", "\n".join(blocks))
+
+    def terraform_test(self) -> Tuple[int, str, str]:
+        """Run ``terraform test``; stdout is its JSON message stream."""
+        return self._run_terraform_command(
+            ["test", "-json", "-no-color"], keep_output=True
+        )
+
+
+def _decode_all(values: Iterable[bytes]) -> Tuple[str, ...]:
+    """Decode names captured from ``.tf`` file bytes."""
+    return tuple(value.decode(errors="replace") for value in values)
+
+
+def parse_test_run_statuses(output: str) -> Dict[str, str]:
+    """Map each run in ``terraform test -json`` output to its final status."""
+    statuses: Dict[str, str] = {}
+    for line in output.splitlines():
+        # Most messages are logs and diagnostics; only parse run updates
+        if '"test_run"' not in line:
+            continue
+        try:
+            message = json.loads(line)
+        except ValueError:
+            continue
+        run = message.get("test_run") if isinstance(message, dict) else None
+        if message.get("type") == "test_run" and run and "status" in run:
+            statuses[run["run"]] = run["status"]
+    return statuses
+
+
+class _ModuleSnapshot(NamedTuple):
+    """Immutable result of parsing one module's ``.tf`` files."""
+
+    sources: Mapping[str, bytes]
+    variables: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    resources: FrozenSet[str]
+    used_variables: FrozenSet[str]
+    terraform_version: Optional[str]
+    providers: Mapping[str, Tuple[str, str]]
+
 
 class TerraformModuleAnalyzer:
     """Analyze Terraform module structure and content."""
 
+    # Patterns run on raw file bytes; only the names they capture are decoded.
+    # Block headers must open a line, so mentions in comments and strings
+    # (``# variable "old"``, ``description = "output \"id\""``) never match.
+    _VARIABLE_RE = re.compile(rb'^[ \t]*variable\s+"([^"]+)"', re.MULTILINE)
+    _OUTPUT_RE = re.compile(rb'^[ \t]*output\s+"([^"]+)"', re.MULTILINE)
+    _RESOURCE_RE = re.compile(rb'^[ \t]*resource\s+"([^"]+)"\s+"[^"]+"', re.MULTILINE)
+    _TERRAFORM_VERSION_RE = re.compile(rb'required_version\s*=\s*"([^"]+)"')
+    _PROVIDER_RE = re.compile(
+        rb'(\w+)\s*=\s*\{[^}]*source\s*=\s*"([^"]+)"[^}]*version\s*=\s*"([^"]+)"'
+    )
+
     def __init__(self, module_path: Path):
         self.module_path = Path(module_path)
 
+    @functools.cached_property
+    def _snapshot(self) -> "_ModuleSnapshot":
+        """Parsed module contents, shared by analyzers of the same unchanged module."""
+        fingerprint = []
+        if self.module_path.is_dir():
+            with os.scandir(self.module_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".tf") and entry.is_file():
+                        stat = entry.stat()
+                        fingerprint.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return self._analyze(str(self.module_path), tuple(sorted(fingerprint)))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _analyze(
+        module_path: str, fingerprint: Tuple[Tuple[str, int, int], ...]
+    ) -> "_ModuleSnapshot":
+        """Read and parse a module's ``.tf`` files.
+
+        Results are cached by path and by the name, mtime and size of every
+        ``.tf`` file, so repeated analyzers for a module do no I/O or regex
+        work until one of its files changes.
+        """
+        analyzer = TerraformModuleAnalyzer
+        sources = {
+            name: Path(module_path, name).read_bytes() for name, _, _ in fingerprint
+        }
+        variables = analyzer._VARIABLE_RE.findall(sources.get("variables.tf", b""))
+
+        # All .tf files except variables.tf
+        all_content = b"\n".join(
+            content for name, content in sources.items() if name != "variables.tf"
+        )
+
+        # One pass over the sources finds every variable that is referenced
+        used_variables: FrozenSet[bytes] = frozenset()
+        if variables:
+            usage_pattern = re.compile(
+                rb"\bvar\.(" + b"|".join(map(re.escape, variables)) + rb")\b"
+            )
+            used_variables = frozenset(usage_pattern.findall(all_content))
+
+        versions = sources.get("versions.tf", b"")
+        terraform_version = analyzer._TERRAFORM_VERSION_RE.search(versions)
+
+        return _ModuleSnapshot(
+            sources=MappingProxyType(sources),
+            variables=_decode_all(variables),
+            outputs=_decode_all(
+                analyzer._OUTPUT_RE.findall(sources.get("outputs.tf", b""))
+            ),
+            # Dedupe the raw matches so each resource type is decoded once
+            resources=frozenset(
+                _decode_all(
+                    {
+                        match.group(1)
+                        for content in sources.values()
+                        for match in analyzer._RESOURCE_RE.finditer(content)
+                    }
+                )
+            ),
+            used_variables=frozenset(_decode_all(used_variables)),
+            terraform_version=(
+                terraform_version.group(1).decode() if terraform_version else None
+            ),
+            providers=MappingProxyType(
+                {
+                    name: (source, version)
+                    for name, source, version in map(
+                        _decode_all, analyzer._PROVIDER_RE.findall(versions)
+                    )
+                }
+            ),
+        )
+
     def check_required_files(self) -> Dict[str, bool]:
         """Check for required Terraform files."""
+        sources = self._snapshot.sources
         return {
-            "main.tf": (self.module_path / "main.tf").exists(),
-            "variables.tf": (self.module_path / "variables.tf").exists(),
-            "outputs.tf": (self.module_path / "outputs.tf").exists(),
-            "versions.tf": (self.module_path / "versions.tf").exists(),
+            "main.tf": "main.tf" in sources,
+            "variables.tf": "variables.tf" in sources,
+            "outputs.tf": "outputs.tf" in sources,
+            "versions.tf": "versions.tf" in sources,
             "README.md": (self.module_path / "README.md").exists(),
         }
 
     def get_defined_variables(self) -> List[str]:
         """Extract variable names from variables.tf."""
-        variables = []
-        variables_file = self.module_path / "variables.tf"
-
-        if variables_file.exists():
-            content = variables_file.read_text()
-            var_pattern = r'variable\s+"([^"]+)"'
-            variables = re.findall(var_pattern, content)
-
-        return variables
+        return list(self._snapshot.variables)
 
     def get_defined_outputs(self) -> List[str]:
         """Extract output names from outputs.tf."""
-        outputs = []
-        outputs_file = self.module_path / "outputs.tf"
-
-        if outputs_file.exists():
-            content = outputs_file.read_text()
-            output_pattern = r'output\s+"([^"]+)"'
-            outputs = re.findall(output_pattern, content)
-
-        return outputs
+        return list(self._snapshot.outputs)
 
     def get_resources_defined(self) -> List[str]:
         """Get list of resource types defined in the module."""
-        resources = []
-
-        for tf_file in self.module_path.glob("*.tf"):
-            content = tf_file.read_text()
-            # Find resource blocks
-            resource_pattern = r'resource\s+"([^"]+)"\s+"[^"]+"'
-            matches = re.findall(resource_pattern, content)
-            resources.extend(matches)
-
-        return list(set(resources))  # Remove duplicates
+        return list(self._snapshot.resources)
 
     def validate_variable_usage(self) -> Dict[str, bool]:
         """Check if all defined variables are used in the module."""
-        defined_vars = self.get_defined_variables()
-        usage_results = {}
-
-        # Read all .tf files except variables.tf
-        all_content = ""
-        for tf_file in self.module_path.glob("*.tf"):
-            if tf_file.name != "variables.tf":
-                all_content += tf_file.read_text() + "\n"
-
-        # Check usage of each variable
-        for var_name in defined_vars:
-            var_usage_pattern = rf"var\.{re.escape(var_name)}\b"
-            is_used = bool(re.search(var_usage_pattern, all_content))
-            usage_results[var_name] = is_used
-
-        return usage_results
+        used_vars = self._snapshot.used_variables
+        return {
+            var_name: var_name in used_vars for var_name in self._snapshot.variables
+        }
 
     def check_terraform_version_constraints(self) -> Dict[str, Any]:
         """Check terraform and provider version constraints."""
-        versions_file = self.module_path / "versions.tf"
-
-        if not versions_file.exists():
+        snapshot = self._snapshot
+        if "versions.tf" not in snapshot.sources:
             return {"has_versions_file": False}
 
-        content = versions_file.read_text()
-
-        # Extract terraform version constraint
-        terraform_version_pattern = r'required_version\s*=\s*"([^"]+)"'
-        terraform_version_match = re.search(terraform_version_pattern, content)
-
-        # Extract provider constraints
-        provider_pattern = (
-            r'(\w+)\s*=\s*\{[^}]*source\s*=\s*"([^"]+)"[^}]*version\s*=\s*"([^"]+)"'
-        )
-        provider_matches = re.findall(provider_pattern, content)
-
         return {
             "has_versions_file": True,
-            "terraform_version": (
-                terraform_version_match.group(1) if terraform_version_match else None
-            ),
+            "terraform_version": snapshot.terraform_version,
             "providers": {
-                match[0]: {"source": match[1], "version": match[2]}
-                for match in provider_matches
+                name: {"source": source, "version": version}
+                for name, (source, version) in snapshot.providers.items()
             },
         }
 
@@ -297,6 +640,36 @@ class TerraformConfigValidator:
             "output_names": defined_outputs,
         }
 
+    def tflint_errors(self) -> List[str]:
+        """Lint the module with tflint and return any errors it reports.
+
+        tflint parses and checks the HCL without installing providers, so it
+        covers syntax checks without ``terraform init``. Warning and notice
+        level issues are not returned.
+        """
+        tflint = get_tflint_path()
+        if not tflint:
+            raise RuntimeError("tflint not found in PATH")
+
+        result = subprocess.run(
+            [tflint, "--format=json", f"--chdir={self.module_path}"],
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        try:
+            report = json.loads(result.stdout)
+        except ValueError:
+            return [result.stderr.strip() or f"tflint exited with {result.returncode}"]
+
+        errors = [error.get("message", "") for error in report.get("errors") or []]
+        errors.extend(
+            f"{issue['rule']['name']}: {issue['message']}"
+            for issue in report.get("issues") or []
+            if issue.get("rule", {}).get("severity") == "error"
+        )
+        return errors
+
     def validate_providers(self) -> Dict[str, Any]:
         """Validate provider configurations."""
         version_info = self.analyzer.check_terraform_version_constraints()
@@ -307,3 +680,151 @@ class TerraformConfigValidator:
             "providers": version_info.get("providers", {}),
             "has_azurerm_provider": "azurerm" in version_info.get("providers", {}),
         }
+
+    def validate_all(self) -> Dict[str, Dict[str, Any]]:
+        """Run every static check, keyed by structure, variables, outputs, providers.
+
+        The checks share this validator's analyzer, so the module's files are
+        read and parsed once for all of them.
+        """
+        return {
+            "structure": self.validate_module_structure(),
+            "variables": self.validate_variables(),
+            "outputs": self.validate_outputs(),
+            "providers": self.validate_providers(),
+        }
+
+
+def validate_cached(
+    module_path: Path,
+    variables: Optional[Dict[str, Any]] = None,
+    cache: Optional[pytest.Cache] = None,
+) -> Tuple[int, str, str]:
+    """Init and validate a module with ``variables``, reusing earlier results.
+
+    Results are keyed by the module's ``.tf`` sources and lock file, the
+    Terraform binary and the variables, and kept in memory so identical
+    configurations are only validated once per process. Passing results are
+    also stored in ``cache`` (the pytest cache, see ``terraform_result_cache``)
+    so later test runs skip them too.
+    """
+    module_fingerprint = _module_fingerprint(Path(module_path))
+    tfvars_json = json.dumps(variables or {}, sort_keys=True)
+    key = hashlib.blake2b(
+        f"{module_fingerprint}\0{tfvars_json}".encode(), digest_size=16
+    ).hexdigest()
+    cache_key = f"terraform/validate/{key}"
+
+    result = _VALIDATE_RESULTS.get(key)
+    if result is None and cache is not None:
+        stored = cache.get(cache_key, None)
+        if stored:
+            result = _VALIDATE_RESULTS[key] = (0, *stored)
+    if result is None:
+        result = _VALIDATE_RESULTS[key] = _validate(
+            str(module_path), module_fingerprint, tfvars_json
+        )
+        if result[0] == 0 and cache is not None:
+            cache.set(cache_key, list(result[1:]))
+    return result
+
+
+def _module_fingerprint(module_path: Path) -> str:
+    """Digest of the sources a module uses and the Terraform binary.
+
+    Covers the ``.tf`` files, the module's dependency lock file, which pins
+    its provider versions, and the Terraform binary and its version.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    terraform = get_terraform_path() or ""
+    digest.update(terraform.encode())
+    if terraform:
+        digest.update(str(os.stat(terraform).st_mtime_ns).encode())
+        digest.update(repr(get_terraform_version()).encode())
+    with contextlib.suppress(OSError):
+        digest.update(b"\0" + (module_path / ".terraform.lock.hcl").read_bytes())
+
+    source_root = _source_root(module_path)
+    if source_root == module_path:
+        sources = TerraformModuleAnalyzer(module_path)._snapshot.sources.items()
+    else:
+        # The whole tree the module climbs into can affect validation, and
+        # which directory of it is validated
+        digest.update(
+            module_path.resolve().relative_to(source_root).as_posix().encode()
+        )
+        sources = (
+            (path.relative_to(source_root).as_posix(), path.read_bytes())
+            for path in source_root.rglob("*.tf")
+            if ".terraform" not in path.parts
+        )
+    for name, content in sorted(sources):
+        digest.update(name.encode() + b"\0" + content)
+    return digest.hexdigest()
+
+
+# Results of validate_cached in this process, by module fingerprint and tfvars
+_VALIDATE_RESULTS: Dict[str, Tuple[int, str, str]] = {}
+
+# Initialized workspaces by module path and fingerprint; each module is only
+# initialized once per process, and validated against each tfvars in turn
+_WORKSPACES: Dict[Tuple[str, str], TerraformValidationTest] = {}
+
+
+@atexit.register
+def _cleanup_workspaces() -> None:
+    """Remove the workspaces kept for validate_cached and shared_workspace."""
+    for validator in _WORKSPACES.values():
+        validator.cleanup()
+    _WORKSPACES.clear()
+
+
+def shared_workspace(module_path: Path) -> TerraformValidationTest:
+    """Initialized workspace for a module, reused for the rest of the process.
+
+    The workspace is reset before it is returned; callers must not clean it
+    up. Raises RuntimeError if ``terraform init`` fails.
+    """
+    validator, result = _initialized_workspace(
+        str(module_path), _module_fingerprint(Path(module_path))
+    )
+    if validator is None:
+        raise RuntimeError(f"Terraform init failed: {result[2]}")
+    validator.reset_state()
+    return validator
+
+
+def _initialized_workspace(
+    module_path: str, module_fingerprint: str
+) -> Tuple[Optional[TerraformValidationTest], Tuple[int, str, str]]:
+    """Return the kept workspace for a module, creating it on first use.
+
+    On an init failure the workspace is discarded and None is returned with
+    the result of ``terraform init``.
+    """
+    validator = _WORKSPACES.get((module_path, module_fingerprint))
+    if validator is not None:
+        return validator, (0, "", "")
+
+    validator = TerraformValidationTest(Path(module_path))
+    validator.setup_test_workspace()
+    result = validator.terraform_init_backend_false()
+    if result[0] != 0:
+        validator.cleanup()
+        return None, result
+    _WORKSPACES[module_path, module_fingerprint] = validator
+    return validator, result
+
+
+def _validate(
+    module_path: str, module_fingerprint: str, tfvars_json: str
+) -> Tuple[int, str, str]:
+    """Validate a module with the given variables in its kept workspace."""
+    validator, result = _initialized_workspace(module_path, module_fingerprint)
+    if validator is None:
+        # Init can fail for reasons outside the module, e.g. the network
+        return result
+
+    validator.reset_state()
+    validator.use_variables(json.loads(tfvars_json))
+    return validator.terraform_validate()
@@ -6,44 +6,48 @@ without requiring Azure provider authentication.
 """
 
 from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
 
 import pytest
 
 from tests.terraform.base_validation import (
     TerraformConfigValidator,
     TerraformModuleAnalyzer,
-    TerraformValidationTest,
+    parse_test_run_statuses,
+    shared_workspace,
+    validate_cached,
 )
-from tests.terraform.config import TerraformTestConfig
+from tests.terraform.config import (
+    TerraformTestConfig,
+    get_module_path,
+    get_terraform_version,
+)
+
+# Every test resource lives in the same subscription and resource group
+_SUB = "/subscriptions/12345678-1234-1234-1234-123456789012"
+_RG = f"{_SUB}/resourceGroups/test-rg"
+
+
+def _rid(provider: str, name: str) -> str:
+    """Azure resource ID of a test resource, e.g. ``_rid("Microsoft.Sql/servers", "x")``."""
+    return f"{_RG}/providers/{provider}/{name}"
+
 
 # Test data for diagnostic settings configurations
 DIAGNOSTIC_SETTINGS_TEST_CONFIGS = {
     "log_analytics_only": {
         "name": "test-diagnostic-setting",
-        "target_resource_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/Microsoft.KeyVault/"
-            "vaults/test-kv"
-        ),
-        "log_analytics_workspace_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/"
-            "Microsoft.OperationalInsights/workspaces/test-law"
+        "target_resource_id": _rid("Microsoft.KeyVault/vaults", "test-kv"),
+        "log_analytics_workspace_id": _rid(
+            "Microsoft.OperationalInsights/workspaces", "test-law"
         ),
         "category_groups": [{"name": "allLogs"}],
         "metrics": ["AllMetrics"],
     },
     "storage_with_retention": {
         "name": "test-storage-diagnostic",
-        "target_resource_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/Microsoft.Sql/servers/test-sql"
-        ),
-        "storage_account_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/"
-            "Microsoft.Storage/storageAccounts/teststore"
-        ),
+        "target_resource_id": _rid("Microsoft.Sql/servers", "test-sql"),
+        "storage_account_id": _rid("Microsoft.Storage/storageAccounts", "teststore"),
         "categories": [
             {
                 "name": "SQLInsights",
@@ -54,14 +58,10 @@ DIAGNOSTIC_SETTINGS_TEST_CONFIGS = {
     },
     "eventhub_streaming": {
         "name": "test-eventhub-diagnostic",
-        "target_resource_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/Microsoft.Web/sites/test-app"
-        ),
-        "eventhub_authorization_rule_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/Microsoft.EventHub/"
-            "namespaces/test-eh/authorizationRules/RootManageSharedAccessKey"
+        "target_resource_id": _rid("Microsoft.Web/sites", "test-app"),
+        "eventhub_authorization_rule_id": _rid(
+            "Microsoft.EventHub/namespaces",
+            "test-eh/authorizationRules/RootManageSharedAccessKey",
         ),
         "eventhub_name": "diagnostics-hub",
         "category_groups": [{"name": "allLogs"}],
@@ -69,25 +69,14 @@ DIAGNOSTIC_SETTINGS_TEST_CONFIGS = {
     },
     "multi_destination": {
         "name": "test-multi-destination",
-        "target_resource_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/Microsoft.Network/"
-            "applicationGateways/test-agw"
-        ),
-        "log_analytics_workspace_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/"
-            "Microsoft.OperationalInsights/workspaces/test-law"
-        ),
-        "storage_account_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/"
-            "Microsoft.Storage/storageAccounts/teststore"
+        "target_resource_id": _rid("Microsoft.Network/applicationGateways", "test-agw"),
+        "log_analytics_workspace_id": _rid(
+            "Microsoft.OperationalInsights/workspaces", "test-law"
         ),
-        "eventhub_authorization_rule_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/Microsoft.EventHub/"
-            "namespaces/test-eh/authorizationRules/RootManageSharedAccessKey"
+        "storage_account_id": _rid("Microsoft.Storage/storageAccounts", "teststore"),
+        "eventhub_authorization_rule_id": _rid(
+            "Microsoft.EventHub/namespaces",
+            "test-eh/authorizationRules/RootManageSharedAccessKey",
         ),
         "eventhub_name": "diagnostics-hub",
         "category_groups": [{"name": "allLogs"}, {"name": "audit"}],
@@ -95,32 +84,99 @@ DIAGNOSTIC_SETTINGS_TEST_CONFIGS = {
     },
     "minimal": {
         "name": "minimal-diagnostic",
-        "target_resource_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/"
-            "Microsoft.Storage/storageAccounts/teststore"
-        ),
-        "log_analytics_workspace_id": (
-            "/subscriptions/12345678-1234-1234-1234-123456789012"
-            "/resourceGroups/test-rg/providers/"
-            "Microsoft.OperationalInsights/workspaces/test-law"
+        "target_resource_id": _rid("Microsoft.Storage/storageAccounts", "teststore"),
+        "log_analytics_workspace_id": _rid(
+            "Microsoft.OperationalInsights/workspaces", "test-law"
         ),
     },
 }
 
-# Test Azure resource types that support diagnostic settings
+# Example configurations shipped with the module
+DIAGNOSTIC_SETTINGS_EXAMPLES = (
+    "basic",
+    "complex-configuration",
+    "eventhub-streaming",
+    "multi-destination",
+    "storage-with-retention",
+)
+
+# Test Azure resource types that support diagnostic settings, with the short
+# name used for each test resource
 TEST_RESOURCE_TYPES = [
-    "Microsoft.KeyVault/vaults",
-    "Microsoft.Storage/storageAccounts",
-    "Microsoft.Sql/servers",
-    "Microsoft.Web/sites",
-    "Microsoft.Network/applicationGateways",
-    "Microsoft.Compute/virtualMachines",
-    "Microsoft.Network/loadBalancers",
-    "Microsoft.EventHub/namespaces",
+    ("Microsoft.KeyVault/vaults", "kv"),
+    ("Microsoft.Storage/storageAccounts", "storage"),
+    ("Microsoft.Sql/servers", "sql"),
+    ("Microsoft.Web/sites", "app"),
+    ("Microsoft.Network/applicationGateways", "agw"),
+    ("Microsoft.Compute/virtualMachines", "vm"),
+    ("Microsoft.Network/loadBalancers", "lb"),
+    ("Microsoft.EventHub/namespaces", "eh"),
 ]
 
 
+def _resource_type_run(short_name: str) -> str:
+    """Name of the plan test run for a resource type."""
+    return f"resource_type_{short_name}"
+
+
+def _resource_type_config(resource_type: str, short_name: str) -> dict:
+    """Configuration targeting a resource of ``resource_type``."""
+    return {
+        "name": f"test-{short_name}-diagnostic",
+        "target_resource_id": _rid(resource_type, f"test-{short_name}"),
+        "log_analytics_workspace_id": _rid(
+            "Microsoft.OperationalInsights/workspaces", "test-law"
+        ),
+        "category_groups": [{"name": "allLogs"}],
+        "metrics": ["AllMetrics"],
+    }
+
+
+@pytest.fixture(scope="module")
+def plan_test_results(
+    request: pytest.FixtureRequest, terraform_result_cache: Optional[pytest.Cache]
+) -> Tuple[Dict[str, str], str]:
+    """Plan every configuration scenario in one ``terraform test`` run.
+
+    Resource type runs are only added with ``--run-slow``; their tests are
+    skipped otherwise. Returns the status of each run by name, and stderr for
+    failure messages. ``terraform test`` with mock providers needs Terraform
+    1.7+; older versions validate each scenario in turn instead.
+    """
+    if TerraformTestConfig.should_skip_terraform_tests():
+        pytest.skip("Terraform configuration tests are disabled")
+
+    runs = dict(DIAGNOSTIC_SETTINGS_TEST_CONFIGS)
+    if request.config.getoption("--run-slow"):
+        runs.update(
+            (
+                _resource_type_run(short_name),
+                _resource_type_config(resource_type, short_name),
+            )
+            for resource_type, short_name in TEST_RESOURCE_TYPES
+        )
+
+    module_path = get_module_path("foundation", "diagnostic-settings")
+    if (get_terraform_version() or ()) < (1, 7):
+        statuses: Dict[str, str] = {}
+        errors = []
+        for name, config in runs.items():
+            ret_code, _, stderr = validate_cached(
+                module_path, config, terraform_result_cache
+            )
+            statuses[name] = "pass" if ret_code == 0 else "fail"
+            if ret_code != 0:
+                errors.append(f"{name}: {stderr}")
+        return statuses, "\n".join(errors)
+
+    # The runs only add a test file, so the module's shared workspace serves
+    validator = shared_workspace(module_path)
+    validator.write_plan_tests("configurations", runs)
+    ret_code, stdout, stderr = validator.terraform_test()
+    validator.reset_state()
+    return parse_test_run_statuses(stdout), stderr
+
+
 @pytest.mark.terraform
 class TestDiagnosticSettingsModuleValidation:
     """
@@ -131,8 +187,7 @@ class TestDiagnosticSettingsModuleValidation:
     @pytest.fixture
     def terraform_diagnostic_settings_module(self) -> Path:
         """Get the path to the diagnostic-settings module."""
-        project_root = Path(__file__).parent.parent.parent
-        return project_root / "terraform" / "foundation" / "diagnostic-settings"
+        return get_module_path("foundation", "diagnostic-settings")
 
     def test_module_has_required_files(
         self, terraform_diagnostic_settings_module: Path
@@ -160,7 +215,7 @@ class TestDiagnosticSettingsModuleValidation:
     ):
         """Test that the module defines expected variables."""
         analyzer = TerraformModuleAnalyzer(terraform_diagnostic_settings_module)
-        variables = analyzer.get_variables()
+        variables = analyzer.get_defined_variables()
 
         # Required variables
         required_vars = ["name", "target_resource_id"]
@@ -189,70 +244,63 @@ class TestDiagnosticSettingsModuleValidation:
     ):
         """Test that the module defines expected outputs."""
         analyzer = TerraformModuleAnalyzer(terraform_diagnostic_settings_module)
-        outputs = analyzer.get_outputs()
+        outputs = analyzer.get_defined_outputs()
 
         expected_outputs = ["id", "name", "target_resource_id"]
         for output_name in expected_outputs:
             assert output_name in outputs, f"Module must define output '{output_name}'"
 
-    def test_module_syntax_is_valid(self, terraform_diagnostic_settings_module: Path):
+    def test_module_syntax_is_valid(
+        self,
+        terraform_diagnostic_settings_module: Path,
+        terraform_result_cache: Optional[pytest.Cache],
+    ):
         """Test that Terraform files have valid syntax."""
         if TerraformTestConfig.should_skip_terraform_tests():
             pytest.skip("Terraform validation tests are disabled")
 
-        with TerraformConfigValidator(
-            terraform_diagnostic_settings_module
-        ) as validator:
-            validator.setup_test_workspace()
-            test_config = DIAGNOSTIC_SETTINGS_TEST_CONFIGS["log_analytics_only"]
-            validator.create_test_tfvars(test_config)
+        if TerraformTestConfig.use_tflint_for_syntax():
+            validator = TerraformConfigValidator(terraform_diagnostic_settings_module)
+            errors = validator.tflint_errors()
+            assert not errors, f"tflint reported errors: {errors}"
+            return
 
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert ret_code == 0, f"Terraform validation failed: {stderr}"
+        test_config = DIAGNOSTIC_SETTINGS_TEST_CONFIGS["log_analytics_only"]
+        ret_code, stdout, stderr = validate_cached(
+            terraform_diagnostic_settings_module, test_config, terraform_result_cache
+        )
+        assert ret_code == 0, f"Terraform validation failed: {stderr}"
 
-    def test_module_formatting(self, terraform_diagnostic_settings_module: Path):
+    def test_module_formatting(
+        self,
+        terraform_diagnostic_settings_module: Path,
+        terraform_fmt_results: FrozenSet[Path],
+    ):
         """Test that Terraform files are properly formatted."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip("Terraform formatting tests are disabled")
-
-        with TerraformConfigValidator(
-            terraform_diagnostic_settings_module
-        ) as validator:
-            validator.setup_test_workspace()
-
-            ret_code, stdout, stderr = validator.terraform_fmt_check()
-            assert ret_code == 0, (
-                f"Terraform files need formatting. Run 'terraform fmt' "
-                f"in {terraform_diagnostic_settings_module}. Output: {stdout}"
-            )
+        module_path = terraform_diagnostic_settings_module.resolve()
+        unformatted = sorted(
+            path.name for path in terraform_fmt_results if path.parent == module_path
+        )
+        assert not unformatted, (
+            f"Terraform files need formatting. Run 'terraform fmt' "
+            f"in {terraform_diagnostic_settings_module}. Files: {unformatted}"
+        )
 
-    @pytest.mark.parametrize(
-        "config_name,config_data",
-        [(name, config) for name, config in DIAGNOSTIC_SETTINGS_TEST_CONFIGS.items()],
-    )
+    @pytest.mark.parametrize("config_name", list(DIAGNOSTIC_SETTINGS_TEST_CONFIGS))
     def test_configuration_is_valid(
-        self,
-        terraform_diagnostic_settings_module: Path,
-        config_name: str,
-        config_data: dict,
+        self, plan_test_results: Tuple[Dict[str, str], str], config_name: str
     ):
         """Test different configuration scenarios are valid."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip("Terraform configuration tests are disabled")
-
-        with TerraformConfigValidator(
-            terraform_diagnostic_settings_module
-        ) as validator:
-            validator.setup_test_workspace()
-            validator.create_test_tfvars(config_data)
-
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert (
-                ret_code == 0
-            ), f"Configuration '{config_name}' failed validation: {stderr}"
+        statuses, stderr = plan_test_results
+        assert (
+            statuses.get(config_name) == "pass"
+        ), f"Configuration '{config_name}' failed its plan run: {stderr}"
 
+    @pytest.mark.slow
     def test_complex_retention_configuration(
-        self, terraform_diagnostic_settings_module: Path
+        self,
+        terraform_diagnostic_settings_module: Path,
+        terraform_result_cache: Optional[pytest.Cache],
     ):
         """Test complex retention policy configurations."""
         if TerraformTestConfig.should_skip_terraform_tests():
@@ -260,15 +308,9 @@ class TestDiagnosticSettingsModuleValidation:
 
         complex_config = {
             "name": "complex-retention-test",
-            "target_resource_id": (
-                "/subscriptions/12345678-1234-1234-1234-123456789012"
-                "/resourceGroups/test-rg/providers/Microsoft.Sql/"
-                "servers/test-sql"
-            ),
-            "storage_account_id": (
-                "/subscriptions/12345678-1234-1234-1234-123456789012"
-                "/resourceGroups/test-rg/providers/"
-                "Microsoft.Storage/storageAccounts/teststore"
+            "target_resource_id": _rid("Microsoft.Sql/servers", "test-sql"),
+            "storage_account_id": _rid(
+                "Microsoft.Storage/storageAccounts", "teststore"
             ),
             "categories": [
                 {
@@ -292,80 +334,43 @@ class TestDiagnosticSettingsModuleValidation:
             ],
         }
 
-        with TerraformConfigValidator(
-            terraform_diagnostic_settings_module
-        ) as validator:
-            validator.setup_test_workspace()
-            validator.create_test_tfvars(complex_config)
-
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert ret_code == 0, f"Complex retention configuration failed: {stderr}"
+        ret_code, stdout, stderr = validate_cached(
+            terraform_diagnostic_settings_module, complex_config, terraform_result_cache
+        )
+        assert ret_code == 0, f"Complex retention configuration failed: {stderr}"
 
-    @pytest.mark.parametrize("resource_type", TEST_RESOURCE_TYPES)
+    @pytest.mark.slow
+    @pytest.mark.parametrize("resource_type,short_name", TEST_RESOURCE_TYPES)
     def test_resource_type_compatibility(
-        self, terraform_diagnostic_settings_module: Path, resource_type: str
+        self,
+        plan_test_results: Tuple[Dict[str, str], str],
+        resource_type: str,
+        short_name: str,
     ):
         """Test that diagnostic settings work with different resource types."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip("Terraform resource type tests are disabled")
-
-        # Create a test resource ID for this resource type
-        resource_name = resource_type.split("/")[-1].replace("s", "")
-        test_config = {
-            "name": f"test-{resource_name}-diagnostic",
-            "target_resource_id": (
-                "/subscriptions/12345678-1234-1234-1234-123456789012"
-                f"/resourceGroups/test-rg/providers/{resource_type}/"
-                f"test-{resource_name}"
-            ),
-            "log_analytics_workspace_id": (
-                "/subscriptions/12345678-1234-1234-1234-123456789012"
-                "/resourceGroups/test-rg/providers/"
-                "Microsoft.OperationalInsights/workspaces/test-law"
-            ),
-            "category_groups": [{"name": "allLogs"}],
-            "metrics": ["AllMetrics"],
-        }
-
-        with TerraformConfigValidator(
-            terraform_diagnostic_settings_module
-        ) as validator:
-            validator.setup_test_workspace()
-            validator.create_test_tfvars(test_config)
-
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert (
-                ret_code == 0
-            ), f"Resource type '{resource_type}' failed validation: {stderr}"
+        statuses, stderr = plan_test_results
+        assert (
+            statuses.get(_resource_type_run(short_name)) == "pass"
+        ), f"Resource type '{resource_type}' failed its plan run: {stderr}"
 
 
 @pytest.mark.terraform
-class TestDiagnosticSettingsExamplesValidation(TerraformValidationTest):
+class TestDiagnosticSettingsExamplesValidation:
     """Test the diagnostic-settings module examples."""
 
     @pytest.fixture
     def examples_dir(self) -> Path:
         """Get the path to the examples directory."""
-        project_root = Path(__file__).parent.parent.parent
-        return (
-            project_root
-            / "terraform"
-            / "foundation"
-            / "diagnostic-settings"
-            / "examples"
-        )
+        return get_module_path("foundation", "diagnostic-settings") / "examples"
 
-    @pytest.mark.parametrize(
-        "example_name",
-        [
-            "basic",
-            "complex-configuration",
-            "eventhub-streaming",
-            "multi-destination",
-            "storage-with-retention",
-        ],
-    )
-    def test_example_syntax_validation(self, examples_dir: Path, example_name: str):
+    @pytest.mark.slow
+    @pytest.mark.parametrize("example_name", DIAGNOSTIC_SETTINGS_EXAMPLES)
+    def test_example_syntax_validation(
+        self,
+        examples_dir: Path,
+        example_name: str,
+        terraform_result_cache: Optional[pytest.Cache],
+    ):
         """Test that example configurations have valid syntax."""
         if TerraformTestConfig.should_skip_terraform_tests():
             pytest.skip("Terraform example tests are disabled")
@@ -373,40 +378,36 @@ class TestDiagnosticSettingsExamplesValidation(TerraformValidationTest):
         example_path = examples_dir / example_name
         assert example_path.exists(), f"Example '{example_name}' not found"
 
-        with TerraformConfigValidator(example_path) as validator:
-            validator.setup_test_workspace()
+        if TerraformTestConfig.use_tflint_for_syntax():
+            errors = TerraformConfigValidator(example_path).tflint_errors()
+            assert not errors, f"Example '{example_name}' has tflint errors: {errors}"
+            return
 
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert (
-                ret_code == 0
-            ), f"Example '{example_name}' failed validation: {stderr}"
-
-    @pytest.mark.parametrize(
-        "example_name",
-        [
-            "basic",
-            "complex-configuration",
-            "eventhub-streaming",
-            "multi-destination",
-            "storage-with-retention",
-        ],
-    )
-    def test_example_formatting(self, examples_dir: Path, example_name: str):
-        """Test that example configurations are properly formatted."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip("Terraform example formatting tests are disabled")
+        ret_code, stdout, stderr = validate_cached(
+            example_path, cache=terraform_result_cache
+        )
+        assert ret_code == 0, f"Example '{example_name}' failed validation: {stderr}"
 
+    @pytest.mark.parametrize("example_name", DIAGNOSTIC_SETTINGS_EXAMPLES)
+    def test_example_formatting(
+        self,
+        examples_dir: Path,
+        example_name: str,
+        terraform_fmt_results: FrozenSet[Path],
+    ):
+        """Test that example configurations are properly formatted."""
         example_path = examples_dir / example_name
         assert example_path.exists(), f"Example '{example_name}' not found"
 
-        with TerraformConfigValidator(example_path) as validator:
-            validator.setup_test_workspace()
-
-            ret_code, stdout, stderr = validator.terraform_fmt_check()
-            assert ret_code == 0, (
-                f"Example '{example_name}' needs formatting. "
-                f"Run 'terraform fmt' in {example_path}. Output: {stdout}"
-            )
+        unformatted = sorted(
+            path.name
+            for path in terraform_fmt_results
+            if path.parent == example_path.resolve()
+        )
+        assert not unformatted, (
+            f"Example '{example_name}' needs formatting. "
+            f"Run 'terraform fmt' in {example_path}. Files: {unformatted}"
+        )
 
     def test_all_examples_have_required_files(self, examples_dir: Path):
         """Test that all examples have required documentation."""
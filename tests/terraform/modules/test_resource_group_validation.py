@@ -5,7 +5,9 @@ These tests focus on syntax validation, structure checking, and static analysis
 without requiring Azure provider authentication.
 """
 
+import json
 from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator
 
 import pytest
 
@@ -14,21 +16,63 @@ from tests.terraform.base_validation import (
     TerraformModuleAnalyzer,
     TerraformValidationTest,
 )
-from tests.terraform.config import TerraformTestConfig
+from tests.terraform.config import TerraformTestConfig, get_module_path
 from tests.terraform.fixtures.test_data import (
     RESOURCE_GROUP_TEST_CONFIGS,
     TEST_LOCATIONS,
 )
 
 
+@pytest.fixture(scope="module")
+def resource_group_workspace() -> Iterator[TerraformValidationTest]:
+    """Initialized workspace for the resource group module, shared by its tests.
+
+    Tests only swap terraform.tfvars.json with ``use_variables``, so the workspace
+    is set up and ``terraform init`` runs once for the whole file.
+    """
+    if TerraformTestConfig.should_skip_terraform_tests():
+        pytest.skip(TerraformTestConfig.get_skip_reason())
+
+    module_path = get_module_path("foundation", "resource-group")
+    with TerraformValidationTest(module_path) as validator:
+        validator.setup_test_workspace()
+        validator.create_minimal_config({})
+
+        # Test terraform init (backend=false)
+        ret_code, stdout, stderr = validator.terraform_init_backend_false()
+        assert ret_code == 0, f"Terraform init failed: {stderr}"
+
+        yield validator
+
+
+def _location_config(location: str) -> Dict[str, Any]:
+    """Resource group variables for ``location``."""
+    return {
+        "name": "test-rg-location",
+        "location": location,
+        "tags": {"Environment": "test"},
+    }
+
+
+@pytest.fixture(scope="module")
+def resource_group_analyzer() -> TerraformModuleAnalyzer:
+    """Analyzer for the resource group module, shared by its static checks.
+
+    The module's files are scanned and parsed once, on first use, instead of
+    each test building its own analyzer.
+    """
+    return TerraformModuleAnalyzer(get_module_path("foundation", "resource-group"))
+
+
 @pytest.mark.terraform
 class TestResourceGroupModuleValidation:
     """Validation tests for the resource group module that don't require Azure auth."""
 
-    def test_module_has_required_files(self, terraform_resource_group_module: Path):
+    def test_module_has_required_files(
+        self, resource_group_analyzer: TerraformModuleAnalyzer
+    ):
         """Test that the module has all required files."""
-        analyzer = TerraformModuleAnalyzer(terraform_resource_group_module)
-        files_check = analyzer.check_required_files()
+        files_check = resource_group_analyzer.check_required_files()
 
         # Core files should exist
         assert files_check["main.tf"], "Module must have main.tf"
@@ -38,10 +82,11 @@ class TestResourceGroupModuleValidation:
         # Documentation should exist
         assert files_check["README.md"], "Module should have README.md documentation"
 
-    def test_module_has_expected_variables(self, terraform_resource_group_module: Path):
+    def test_module_has_expected_variables(
+        self, resource_group_analyzer: TerraformModuleAnalyzer
+    ):
         """Test that the module defines expected variables."""
-        analyzer = TerraformModuleAnalyzer(terraform_resource_group_module)
-        variables = analyzer.get_defined_variables()
+        variables = resource_group_analyzer.get_defined_variables()
 
         # Resource group module should have these core variables
         expected_variables = {"name", "location", "tags"}
@@ -49,10 +94,11 @@ class TestResourceGroupModuleValidation:
         for var in expected_variables:
             assert var in variables, f"Module should define variable '{var}'"
 
-    def test_module_has_expected_outputs(self, terraform_resource_group_module: Path):
+    def test_module_has_expected_outputs(
+        self, resource_group_analyzer: TerraformModuleAnalyzer
+    ):
         """Test that the module defines expected outputs."""
-        analyzer = TerraformModuleAnalyzer(terraform_resource_group_module)
-        outputs = analyzer.get_defined_outputs()
+        outputs = resource_group_analyzer.get_defined_outputs()
 
         # Resource group module should output key information
         expected_outputs = {"id", "name", "location"}
@@ -61,32 +107,31 @@ class TestResourceGroupModuleValidation:
             assert output in outputs, f"Module should define output '{output}'"
 
     def test_module_defines_azure_resources(
-        self, terraform_resource_group_module: Path
+        self, resource_group_analyzer: TerraformModuleAnalyzer
     ):
         """Test that the module defines expected Azure resources."""
-        analyzer = TerraformModuleAnalyzer(terraform_resource_group_module)
-        resources = analyzer.get_resources_defined()
+        resources = resource_group_analyzer.get_resources_defined()
 
         # Should define azurerm_resource_group
         assert (
             "azurerm_resource_group" in resources
         ), "Module should define azurerm_resource_group resource"
 
-    def test_all_variables_are_used(self, terraform_resource_group_module: Path):
+    def test_all_variables_are_used(
+        self, resource_group_analyzer: TerraformModuleAnalyzer
+    ):
         """Test that all defined variables are actually used in the module."""
-        analyzer = TerraformModuleAnalyzer(terraform_resource_group_module)
-        usage_check = analyzer.validate_variable_usage()
+        usage_check = resource_group_analyzer.validate_variable_usage()
 
         unused_vars = [var for var, used in usage_check.items() if not used]
 
         assert len(unused_vars) == 0, f"Unused variables found: {unused_vars}"
 
     def test_module_has_version_constraints(
-        self, terraform_resource_group_module: Path
+        self, resource_group_analyzer: TerraformModuleAnalyzer
     ):
         """Test that the module has proper version constraints."""
-        analyzer = TerraformModuleAnalyzer(terraform_resource_group_module)
-        version_info = analyzer.check_terraform_version_constraints()
+        version_info = resource_group_analyzer.check_terraform_version_constraints()
 
         if version_info["has_versions_file"]:
             # If versions.tf exists, it should have provider constraints
@@ -98,94 +143,81 @@ class TestResourceGroupModuleValidation:
         "test_config_name", ["basic", "minimal", "with_extensive_tags"]
     )
     def test_syntax_validation_with_different_configs(
-        self, terraform_resource_group_module: Path, test_config_name: str
+        self, resource_group_workspace: TerraformValidationTest, test_config_name: str
     ):
         """Test that module syntax is valid with different configurations."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip(TerraformTestConfig.get_skip_reason())
-
         test_config = RESOURCE_GROUP_TEST_CONFIGS[test_config_name]
+        resource_group_workspace.use_variables(test_config)
 
-        with TerraformValidationTest(terraform_resource_group_module) as validator:
-            validator.setup_test_workspace()
-            validator.create_minimal_config(test_config)
-
-            # Test terraform init (backend=false)
-            ret_code, stdout, stderr = validator.terraform_init_backend_false()
-            assert ret_code == 0, f"Terraform init failed: {stderr}"
+        # Test terraform validate
+        ret_code, stdout, stderr = resource_group_workspace.terraform_validate()
+        assert ret_code == 0, f"Terraform validate failed: {stderr}"
 
-            # Test terraform validate
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert ret_code == 0, f"Terraform validate failed: {stderr}"
-
-    @pytest.mark.parametrize("location", TEST_LOCATIONS)
-    def test_syntax_validation_with_different_locations(
-        self, terraform_resource_group_module: Path, location: str
+    def test_variables_render_for_all_locations(
+        self, resource_group_workspace: TerraformValidationTest
     ):
-        """Test syntax validation with different Azure locations."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip(TerraformTestConfig.get_skip_reason())
-
-        test_config = {
-            "name": "test-rg-location",
-            "location": location,
-            "tags": {"Environment": "test"},
-        }
-
-        with TerraformValidationTest(terraform_resource_group_module) as validator:
-            validator.setup_test_workspace()
-            validator.create_minimal_config(test_config)
+        """Test that variables for every test location are written intact."""
+        tfvars = resource_group_workspace.test_dir / "terraform.tfvars.json"
+        for location in TEST_LOCATIONS:
+            test_config = _location_config(location)
+            resource_group_workspace.use_variables(test_config)
+
+            assert (
+                json.loads(tfvars.read_text()) == test_config
+            ), f"Variables for location '{location}' did not round-trip"
+
+    def test_syntax_validation_with_location(
+        self, resource_group_workspace: TerraformValidationTest
+    ):
+        """Test syntax validation with a representative Azure location.
 
-            ret_code, stdout, stderr = validator.terraform_init_backend_false()
-            assert ret_code == 0, f"Init failed for location '{location}': {stderr}"
+        ``terraform validate`` does not depend on the location's value, so one
+        run covers every entry in TEST_LOCATIONS.
+        """
+        location = TEST_LOCATIONS[0]
+        resource_group_workspace.use_variables(_location_config(location))
 
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert ret_code == 0, f"Validate failed for location '{location}': {stderr}"
+        ret_code, stdout, stderr = resource_group_workspace.terraform_validate()
+        assert ret_code == 0, f"Validate failed for location '{location}': {stderr}"
 
-    def test_terraform_formatting(self, terraform_resource_group_module: Path):
+    def test_terraform_formatting(
+        self,
+        terraform_resource_group_module: Path,
+        terraform_fmt_results: FrozenSet[Path],
+    ):
         """Test that Terraform files are properly formatted."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip(TerraformTestConfig.get_skip_reason())
-
-        with TerraformValidationTest(terraform_resource_group_module) as validator:
-            validator.setup_test_workspace()
-
-            ret_code, stdout, stderr = validator.terraform_fmt_check()
-            assert ret_code == 0, f"Terraform formatting check failed: {stderr}"
+        module_path = terraform_resource_group_module.resolve()
+        unformatted = sorted(
+            path.name for path in terraform_fmt_results if path.parent == module_path
+        )
+        assert not unformatted, f"Terraform formatting check failed: {unformatted}"
 
     def test_terraform_validate_syntax_only(
-        self, terraform_resource_group_module: Path
+        self, resource_group_workspace: TerraformValidationTest
     ):
         """Test that terraform validate checks syntax but not variable values."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip(TerraformTestConfig.get_skip_reason())
-
         # Test with missing required variables - this should still pass validation
         # because terraform validate only checks syntax, not variable requirements
         incomplete_config = {
             "tags": {"Environment": "test"}
             # Missing both 'name' and 'location' which are required at plan/apply time
         }
+        resource_group_workspace.use_variables(incomplete_config)
 
-        with TerraformValidationTest(terraform_resource_group_module) as validator:
-            validator.setup_test_workspace()
-            validator.create_minimal_config(incomplete_config)
-
-            ret_code, stdout, stderr = validator.terraform_init_backend_false()
-            assert ret_code == 0, f"Init should succeed: {stderr}"
+        # Validation succeeds because it only checks HCL syntax, not variable values
+        ret_code, stdout, stderr = resource_group_workspace.terraform_validate()
+        assert ret_code == 0, f"Validation should succeed (syntax-only): {stderr}"
 
-            # Validation succeeds because it only checks HCL syntax, not variable values
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert ret_code == 0, f"Validation should succeed (syntax-only): {stderr}"
-
-            # Note: Missing variable values would only be caught during terraform plan
+        # Note: Missing variable values would only be caught during terraform plan
 
     def test_module_structure_validation(self, terraform_resource_group_module: Path):
         """Test comprehensive module structure validation."""
-        validator = TerraformConfigValidator(terraform_resource_group_module)
+        results = TerraformConfigValidator(
+            terraform_resource_group_module
+        ).validate_all()
 
         # Test structure
-        structure_result = validator.validate_module_structure()
+        structure_result = results["structure"]
         assert structure_result["has_main_tf"], "Module must have main.tf"
         assert structure_result["has_variables_tf"], "Module must have variables.tf"
         assert structure_result["has_outputs_tf"], "Module must have outputs.tf"
@@ -194,7 +226,7 @@ class TestResourceGroupModuleValidation:
         ), "Module structure score should be at least 60%"
 
         # Test variables
-        variables_result = validator.validate_variables()
+        variables_result = results["variables"]
         assert variables_result["total_variables"] > 0, "Module should define variables"
         assert variables_result["all_variables_used"], (
             f"All variables should be used, "
@@ -202,14 +234,14 @@ class TestResourceGroupModuleValidation:
         )
 
         # Test outputs
-        outputs_result = validator.validate_outputs()
+        outputs_result = results["outputs"]
         assert outputs_result["has_outputs"], "Module should define outputs"
         assert (
             outputs_result["total_outputs"] > 0
         ), "Module should have at least one output"
 
         # Test providers
-        providers_result = validator.validate_providers()
+        providers_result = results["providers"]
         # Note: versions.tf might not exist in this module, so we just check if it does
         if providers_result["has_version_constraints"]:
             assert providers_result[
@@ -222,12 +254,9 @@ class TestResourceGroupModuleIntegration:
     """Integration-style tests that still work without Azure authentication."""
 
     def test_module_can_be_instantiated_multiple_times(
-        self, terraform_resource_group_module: Path
+        self, resource_group_workspace: TerraformValidationTest
     ):
         """Test that the module configuration supports multiple instances."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip(TerraformTestConfig.get_skip_reason())
-
         # Create a test configuration that instantiates the module twice
         test_configs = [
             {"name": "test-rg-1", "location": "East US", "tags": {"env": "test1"}},
@@ -235,21 +264,15 @@ class TestResourceGroupModuleIntegration:
         ]
 
         for i, config in enumerate(test_configs):
-            with TerraformValidationTest(terraform_resource_group_module) as validator:
-                validator.setup_test_workspace()
-                validator.create_minimal_config(config)
+            resource_group_workspace.use_variables(config)
 
-                ret_code, stdout, stderr = validator.terraform_init_backend_false()
-                assert ret_code == 0, f"Init failed for config {i}: {stderr}"
+            ret_code, stdout, stderr = resource_group_workspace.terraform_validate()
+            assert ret_code == 0, f"Validate failed for config {i}: {stderr}"
 
-                ret_code, stdout, stderr = validator.terraform_validate()
-                assert ret_code == 0, f"Validate failed for config {i}: {stderr}"
-
-    def test_complex_tags_configuration(self, terraform_resource_group_module: Path):
+    def test_complex_tags_configuration(
+        self, resource_group_workspace: TerraformValidationTest
+    ):
         """Test module with complex tags configuration."""
-        if TerraformTestConfig.should_skip_terraform_tests():
-            pytest.skip(TerraformTestConfig.get_skip_reason())
-
         complex_config = {
             "name": "test-rg-complex-tags",
             "location": "West Europe",
@@ -264,12 +287,7 @@ class TestResourceGroupModuleIntegration:
             },
         }
 
-        with TerraformValidationTest(terraform_resource_group_module) as validator:
-            validator.setup_test_workspace()
-            validator.create_minimal_config(complex_config)
-
-            ret_code, stdout, stderr = validator.terraform_init_backend_false()
-            assert ret_code == 0, f"Init failed: {stderr}"
+        resource_group_workspace.use_variables(complex_config)
 
-            ret_code, stdout, stderr = validator.terraform_validate()
-            assert ret_code == 0, f"Validate failed: {stderr}"
+        ret_code, stdout, stderr = resource_group_workspace.terraform_validate()
+        assert ret_code == 0, f"Validate failed: {stderr}"
@@ -1,33 +1,96 @@
 """Test cases for the diagnostic-settings Terraform module."""
 
+import functools
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from typing import List, Mapping, Pattern, Tuple
 
 import pytest
 
+from tests._source_cache import module_sources
+
+# Module files that must exist
+MODULE_SOURCES = (
+    "main.tf",
+    "variables.tf",
+    "outputs.tf",
+    "versions.tf",
+    "locals.tf",
+    "README.md",
+)
+
+# Files every example must have
+EXAMPLE_SOURCES = ("main.tf", "variables.tf", "outputs.tf", "README.md")
+
+
+@pytest.fixture(scope="module")
+def module_path() -> Path:
+    """Get the path to the diagnostic-settings module."""
+    project_root = Path(__file__).parent.parent
+    return project_root / "terraform" / "foundation" / "diagnostic-settings"
+
+
+@pytest.fixture
+def tf_sources(module_path: Path) -> Mapping[str, str]:
+    """Contents of the module's files by name, read once per session."""
+    return module_sources(module_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _token_pattern(tokens: Tuple[str, ...]) -> Pattern[str]:
+    """One pattern that finds every token, overlapping ones included."""
+    alternatives = sorted(tokens, key=len, reverse=True)
+    return re.compile("(?=(" + "|".join(map(re.escape, alternatives)) + "))")
+
+
+def missing_tokens(content: str, *tokens: str) -> List[str]:
+    """Return the ``tokens`` not found in ``content``, in the order given.
+
+    ``content`` is scanned once for all tokens. A token that is a prefix of
+    another can be shadowed by it at the same offset, so tokens the scan did
+    not report are checked individually before being called missing.
+    """
+    found = set(_token_pattern(tokens).findall(content))
+    return [token for token in tokens if token not in found and token not in content]
+
+
+def token_counts(content: str, *tokens: str) -> Counter:
+    """Count each of ``tokens`` in ``content`` with a single scan.
+
+    Matches may overlap, so counts only equal ``str.count`` for tokens that
+    cannot overlap themselves or each other.
+    """
+    counts = Counter(_token_pattern(tokens).findall(content))
+    return Counter({token: counts[token] for token in tokens})
+
+
+def _example_reference_errors(module_path: Path, example: str) -> List[str]:
+    """Problems with how ``example`` calls the module; none if it has no main.tf."""
+    example_path = module_path / "examples" / example
+    if not (example_path / "main.tf").exists():
+        return []
+    content = module_sources(example_path)["main.tf"]
+    return [
+        f"{example}: missing {token}"
+        for token in missing_tokens(
+            content, 'module "diagnostic_settings"', 'source = "../../"'
+        )
+    ]
+
 
 class TestDiagnosticSettingsModule:
     """Test cases for the diagnostic-settings module structure and content."""
 
-    @pytest.fixture
-    def module_path(self) -> Path:
-        """Get the path to the diagnostic-settings module."""
-        project_root = Path(__file__).parent.parent
-        return project_root / "terraform" / "foundation" / "diagnostic-settings"
-
     def test_module_files_exist(self, module_path: Path) -> None:
         """Test that all required module files exist."""
-        required_files = [
-            "main.tf",
-            "variables.tf",
-            "outputs.tf",
-            "versions.tf",
-            "locals.tf",
-            "README.md",
-        ]
-
-        for file_name in required_files:
-            file_path = module_path / file_name
-            assert file_path.exists(), f"Required file {file_name} does not exist"
+        # One directory listing instead of a stat per file
+        present = set(os.listdir(module_path))
+        for file_name in MODULE_SOURCES:
+            assert file_name in present, f"Required file {file_name} does not exist"
 
     def test_example_files_exist(self, module_path: Path) -> None:
         """Test that example files exist."""
@@ -39,103 +102,122 @@ class TestDiagnosticSettingsModule:
             "storage-with-retention",
         ]
 
+        examples_dir = os.path.join(module_path, "examples")
         for example in examples:
-            example_path = module_path / "examples" / example
-            required_files = ["main.tf", "variables.tf", "outputs.tf", "README.md"]
+            example_path = os.path.join(examples_dir, example)
+            present = (
+                set(os.listdir(example_path)) if os.path.isdir(example_path) else set()
+            )
 
-            for file_name in required_files:
-                file_path = example_path / file_name
+            for file_name in EXAMPLE_SOURCES:
                 assert (
-                    file_path.exists()
+                    file_name in present
                 ), f"Required example file {file_name} does not exist in {example}"
 
-    def test_main_tf_contains_resource(self, module_path: Path) -> None:
+    def test_main_tf_contains_resource(self, tf_sources: Mapping[str, str]) -> None:
         """Test that main.tf contains the azurerm_monitor_diagnostic_setting resource."""
-        main_tf = module_path / "main.tf"
-        content = main_tf.read_text()
-
-        assert 'resource "azurerm_monitor_diagnostic_setting" "this"' in content
-        assert "name               = var.name" in content
-        assert "target_resource_id = var.target_resource_id" in content
-
-    def test_variables_tf_contains_required_vars(self, module_path: Path) -> None:
+        content = tf_sources["main.tf"]
+
+        missing = missing_tokens(
+            content,
+            'resource "azurerm_monitor_diagnostic_setting" "this"',
+            "name               = var.name",
+            "target_resource_id = var.target_resource_id",
+        )
+        assert not missing, f"Missing from main.tf: {missing}"
+
+    def test_variables_tf_contains_required_vars(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that variables.tf contains required variables."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
-
-        # Core required variables
-        assert 'variable "name"' in content
-        assert 'variable "target_resource_id"' in content
-
-        # Destination variables
-        assert 'variable "log_analytics_workspace_id"' in content
-        assert 'variable "storage_account_id"' in content
-        assert 'variable "eventhub_authorization_rule_id"' in content
-        assert 'variable "eventhub_name"' in content
-
-        # Configuration variables
-        assert 'variable "categories"' in content
-        assert 'variable "category_groups"' in content
-        assert 'variable "metrics"' in content
-
-    def test_variables_have_validation(self, module_path: Path) -> None:
+        content = tf_sources["variables.tf"]
+
+        missing = missing_tokens(
+            content,
+            # Core required variables
+            'variable "name"',
+            'variable "target_resource_id"',
+            # Destination variables
+            'variable "log_analytics_workspace_id"',
+            'variable "storage_account_id"',
+            'variable "eventhub_authorization_rule_id"',
+            'variable "eventhub_name"',
+            # Configuration variables
+            'variable "categories"',
+            'variable "category_groups"',
+            'variable "metrics"',
+        )
+        assert not missing, f"Missing from variables.tf: {missing}"
+
+    def test_variables_have_validation(self, tf_sources: Mapping[str, str]) -> None:
         """Test that key variables have validation rules."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
+        content = tf_sources["variables.tf"]
 
         # Should have validation blocks for critical variables
-        assert "validation {" in content
-        assert "regex(" in content
-        assert "error_message" in content
-
-    def test_outputs_tf_contains_required_outputs(self, module_path: Path) -> None:
+        missing = missing_tokens(
+            content,
+            "validation {",
+            "regex(",
+            "error_message",
+        )
+        assert not missing, f"Missing from variables.tf: {missing}"
+
+    def test_outputs_tf_contains_required_outputs(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that outputs.tf contains required outputs."""
-        outputs_tf = module_path / "outputs.tf"
-        content = outputs_tf.read_text()
-
-        assert 'output "id"' in content
-        assert 'output "name"' in content
-        assert 'output "target_resource_id"' in content
-
-    def test_locals_tf_contains_destination_validation(self, module_path: Path) -> None:
+        content = tf_sources["outputs.tf"]
+
+        missing = missing_tokens(
+            content,
+            'output "id"',
+            'output "name"',
+            'output "target_resource_id"',
+        )
+        assert not missing, f"Missing from outputs.tf: {missing}"
+
+    def test_locals_tf_contains_destination_validation(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that locals.tf contains destination validation logic."""
-        locals_tf = module_path / "locals.tf"
-        content = locals_tf.read_text()
+        content = tf_sources["locals.tf"]
 
         assert "locals {" in content
         assert "has_destination" in content or "destination" in content
 
-    def test_versions_tf_contains_requirements(self, module_path: Path) -> None:
+    def test_versions_tf_contains_requirements(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that versions.tf contains terraform and provider requirements."""
-        versions_tf = module_path / "versions.tf"
-        content = versions_tf.read_text()
+        content = tf_sources["versions.tf"]
 
-        assert 'required_version = ">= 1.0"' in content
-        assert "hashicorp/azurerm" in content
-        assert 'version = ">= 3.0"' in content
+        missing = missing_tokens(
+            content,
+            'required_version = ">= 1.0"',
+            "hashicorp/azurerm",
+            'version = ">= 3.0"',
+        )
+        assert not missing, f"Missing from versions.tf: {missing}"
 
-    def test_readme_exists_and_has_content(self, module_path: Path) -> None:
+    def test_readme_exists_and_has_content(self, tf_sources: Mapping[str, str]) -> None:
         """Test that README.md exists and has basic content."""
-        readme = module_path / "README.md"
-        content = readme.read_text()
+        content = tf_sources["README.md"]
 
         assert "Diagnostic Settings" in content
         assert "## Usage" in content
         assert "## Variables" in content or "## Inputs" in content
         assert "## Outputs" in content
 
-    def test_main_tf_has_dynamic_blocks(self, module_path: Path) -> None:
+    def test_main_tf_has_dynamic_blocks(self, tf_sources: Mapping[str, str]) -> None:
         """Test that main.tf uses dynamic blocks for flexible configuration."""
-        main_tf = module_path / "main.tf"
-        content = main_tf.read_text()
+        content = tf_sources["main.tf"]
 
         assert "dynamic " in content
         assert "enabled_log" in content or "metric" in content
 
-    def test_main_tf_has_lifecycle_rules(self, module_path: Path) -> None:
+    def test_main_tf_has_lifecycle_rules(self, tf_sources: Mapping[str, str]) -> None:
         """Test that main.tf has lifecycle validation rules."""
-        main_tf = module_path / "main.tf"
-        content = main_tf.read_text()
+        content = tf_sources["main.tf"]
 
         assert "lifecycle {" in content
         assert "precondition {" in content or "postcondition {" in content
@@ -150,30 +232,34 @@ class TestDiagnosticSettingsModule:
             "storage-with-retention",
         ]
 
-        for example in examples:
-            example_main = module_path / "examples" / example / "main.tf"
-            if example_main.exists():
-                content = example_main.read_text()
+        # Read the examples concurrently; each check then runs in memory
+        with ThreadPoolExecutor(max_workers=len(examples)) as executor:
+            results = list(
+                executor.map(_example_reference_errors, repeat(module_path), examples)
+            )
 
-                assert 'module "diagnostic_settings"' in content
-                assert 'source = "../../"' in content
+        errors = [error for example_errors in results for error in example_errors]
+        assert not errors, f"Examples do not reference the module correctly: {errors}"
 
-    def test_variable_types_are_correct(self, module_path: Path) -> None:
+    def test_variable_types_are_correct(self, tf_sources: Mapping[str, str]) -> None:
         """Test that variables have correct types."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
-
-        # String variables
-        assert "type        = string" in content
-
-        # List variables
-        assert "type        = list(string)" in content
-        assert "list(object(" in content
-
-    def test_variable_defaults_are_appropriate(self, module_path: Path) -> None:
+        content = tf_sources["variables.tf"]
+
+        missing = missing_tokens(
+            content,
+            # String variables
+            "type        = string",
+            # List variables
+            "type        = list(string)",
+            "list(object(",
+        )
+        assert not missing, f"Missing from variables.tf: {missing}"
+
+    def test_variable_defaults_are_appropriate(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that variables have appropriate default values."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
+        content = tf_sources["variables.tf"]
 
         # Optional destination variables should default to null
         assert "default     = null" in content
@@ -181,46 +267,49 @@ class TestDiagnosticSettingsModule:
         # List variables should default to empty lists
         assert "default = []" in content
 
-    def test_outputs_have_descriptions(self, module_path: Path) -> None:
+    def test_outputs_have_descriptions(self, tf_sources: Mapping[str, str]) -> None:
         """Test that all outputs have descriptions."""
-        outputs_tf = module_path / "outputs.tf"
-        content = outputs_tf.read_text()
+        content = tf_sources["outputs.tf"]
 
-        # Count outputs and descriptions
-        output_count = content.count('output "')
-        description_count = content.count("description =")
+        # Count outputs and descriptions in one scan
+        counts = token_counts(content, 'output "', "description =")
+        output_count, description_count = counts['output "'], counts["description ="]
 
         assert output_count > 0, "Module should have outputs"
         assert output_count == description_count, "All outputs should have descriptions"
 
-    def test_variables_have_descriptions(self, module_path: Path) -> None:
+    def test_variables_have_descriptions(self, tf_sources: Mapping[str, str]) -> None:
         """Test that all variables have descriptions."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
+        content = tf_sources["variables.tf"]
 
-        # Count variables and descriptions
-        variable_count = content.count('variable "')
-        description_count = content.count("description =")
+        # Count variables and descriptions in one scan
+        counts = token_counts(content, 'variable "', "description =")
+        variable_count = counts['variable "']
+        description_count = counts["description ="]
 
         assert variable_count > 0, "Module should have variables"
         assert (
             variable_count == description_count
         ), "All variables should have descriptions"
 
-    def test_azure_resource_id_validation_patterns(self, module_path: Path) -> None:
+    def test_azure_resource_id_validation_patterns(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that Azure resource ID validation patterns are correct."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
+        content = tf_sources["variables.tf"]
 
         # Should validate Azure resource ID format
-        assert "/subscriptions/" in content
-        assert "/resourceGroups/" in content
-        assert "/providers/" in content
-
-    def test_retention_policy_validation(self, module_path: Path) -> None:
+        missing = missing_tokens(
+            content,
+            "/subscriptions/",
+            "/resourceGroups/",
+            "/providers/",
+        )
+        assert not missing, f"Missing from variables.tf: {missing}"
+
+    def test_retention_policy_validation(self, tf_sources: Mapping[str, str]) -> None:
         """Test that retention policy validation is present."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
+        content = tf_sources["variables.tf"]
 
         # Should validate retention days
         assert "days" in content
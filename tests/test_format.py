@@ -2,25 +2,27 @@
 Tests for the format.py script.
 """
 
-import sys
+import subprocess
 from pathlib import Path
 
 import pytest
+from format import CodeFormatter, _git_changed_files
 
-# Add scripts directory to Python path before importing from format module
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
-# This import must come after sys.path modification  # noqa: E402
-from format import CodeFormatter
+@pytest.fixture(scope="module")
+def shared_formatter() -> CodeFormatter:
+    """One formatter for the repository, so its cached globs serve every test."""
+    return CodeFormatter(Path.cwd())
 
 
 class TestCodeFormatter:
     """Test cases for CodeFormatter class."""
 
-    def setup_method(self) -> None:
+    @pytest.fixture(autouse=True)
+    def setup_formatter(self, shared_formatter: CodeFormatter) -> None:
         """Set up test fixtures."""
-        self.base_path = Path.cwd()
-        self.formatter = CodeFormatter(self.base_path)
+        self.base_path = shared_formatter.base_path
+        self.formatter = shared_formatter
 
     def test_formatter_initialization(self) -> None:
         """Test that formatter initializes correctly."""
@@ -51,9 +53,11 @@ class TestCodeFormatter:
         if terraform_dir.exists():
             assert terraform_dir in paths
 
-    def test_find_terraform_paths_with_no_terraform_dir(self, tmp_path: Path) -> None:
+    def test_find_terraform_paths_with_no_terraform_dir(
+        self, fast_tmp_path: Path
+    ) -> None:
         """Test finding terraform paths when no terraform directory exists."""
-        formatter = CodeFormatter(tmp_path)
+        formatter = CodeFormatter(fast_tmp_path)
         paths = formatter.find_terraform_paths()
 
         # Should return empty list or just root if .tf files exist
@@ -64,10 +68,11 @@ class TestCodeFormatter:
 class TestCodeFormatterMethods:
     """Unit tests for individual formatter methods."""
 
-    def setup_method(self) -> None:
+    @pytest.fixture(autouse=True)
+    def setup_formatter(self, shared_formatter: CodeFormatter) -> None:
         """Set up test fixtures."""
-        self.base_path = Path.cwd()
-        self.formatter = CodeFormatter(self.base_path)
+        self.base_path = shared_formatter.base_path
+        self.formatter = shared_formatter
 
     def test_find_python_paths_returns_list(self) -> None:
         """Test that find_python_paths returns a list."""
@@ -79,6 +84,158 @@ class TestCodeFormatterMethods:
         paths = self.formatter.find_terraform_paths()
         assert isinstance(paths, list)
 
+    def test_shard_splits_files_across_jobs(self) -> None:
+        """Test that files are split into at most ``jobs`` disjoint shards."""
+        formatter = CodeFormatter(self.base_path, jobs=2)
+        files = ["a.py", "b.py", "c.py"]
+
+        shards = formatter._shard(files)
+
+        assert len(shards) == 2
+        assert sorted(f for shard in shards for f in shard) == files
+
+    def test_expand_python_files(self, fast_tmp_path: Path) -> None:
+        """Test that directories are expanded into their Python files."""
+        (fast_tmp_path / "pkg").mkdir()
+        (fast_tmp_path / "pkg" / "module.py").write_text("x = 1\n")
+        (fast_tmp_path / "pkg" / "notes.txt").write_text("not python\n")
+
+        files = self.formatter._expand_python_files([fast_tmp_path / "pkg"])
+
+        assert files == [str(fast_tmp_path / "pkg" / "module.py")]
+
+    def test_cached_glob_reuses_results(self, fast_tmp_path: Path) -> None:
+        """Test that repeated globs within a run are served from the cache."""
+        (fast_tmp_path / "module.py").write_text("x = 1\n")
+        formatter = CodeFormatter(fast_tmp_path)
+
+        first = formatter._cached_glob(fast_tmp_path, "**/*.py")
+        (fast_tmp_path / "added_later.py").write_text("y = 2\n")
+
+        assert formatter._cached_glob(fast_tmp_path, "**/*.py") is first
+        assert first == [fast_tmp_path / "module.py"]
+
+    def test_cached_glob_prunes_skipped_dirs(self, fast_tmp_path: Path) -> None:
+        """Test that recursive globs do not descend into dependency dirs."""
+        (fast_tmp_path / "pkg").mkdir()
+        (fast_tmp_path / "pkg" / "module.py").write_text("x = 1\n")
+        (fast_tmp_path / ".venv" / "lib").mkdir(parents=True)
+        (fast_tmp_path / ".venv" / "lib" / "vendored.py").write_text("y = 2\n")
+
+        files = CodeFormatter(fast_tmp_path)._cached_glob(fast_tmp_path, "**/*.py")
+
+        assert files == [fast_tmp_path / "pkg" / "module.py"]
+
+    def test_expand_python_files_orders_largest_first(
+        self, fast_tmp_path: Path
+    ) -> None:
+        """Test that larger files are dispatched before smaller ones."""
+        (fast_tmp_path / "small.py").write_text("x = 1\n")
+        (fast_tmp_path / "large.py").write_text("x = 1\n" * 100)
+
+        files = self.formatter._expand_python_files([fast_tmp_path])
+
+        assert files == [
+            str(fast_tmp_path / "large.py"),
+            str(fast_tmp_path / "small.py"),
+        ]
+
+    def test_collapse_nested_keeps_only_roots(self, fast_tmp_path: Path) -> None:
+        """Test that nested Terraform paths are covered by their parent."""
+        (fast_tmp_path / "terraform" / "modules").mkdir(parents=True)
+        (fast_tmp_path / "other").mkdir()
+
+        roots = CodeFormatter._collapse_nested(
+            [
+                fast_tmp_path / "terraform" / "modules",
+                fast_tmp_path / "other",
+                fast_tmp_path,
+            ]
+        )
+
+        assert roots == [fast_tmp_path.resolve()]
+
+        roots = CodeFormatter._collapse_nested(
+            [fast_tmp_path / "terraform", fast_tmp_path / "terraform" / "modules"]
+        )
+
+        assert roots == [(fast_tmp_path / "terraform").resolve()]
+
+    def test_scan_tf_files_skips_hidden_dirs(self, fast_tmp_path: Path) -> None:
+        """Test that .tf files are found outside hidden directories only."""
+        (fast_tmp_path / "module").mkdir()
+        (fast_tmp_path / "module" / "main.tf").write_text("# main\n")
+        (fast_tmp_path / ".terraform").mkdir()
+        (fast_tmp_path / ".terraform" / "cached.tf").write_text("# cached\n")
+
+        stats = CodeFormatter._scan_tf_files([fast_tmp_path])
+
+        assert list(stats) == [str(fast_tmp_path / "module" / "main.tf")]
+        assert stats[str(fast_tmp_path / "module" / "main.tf")][1] == len("# main\n")
+
+    def test_scan_tf_files_covers_every_fmt_file_type(
+        self, fast_tmp_path: Path
+    ) -> None:
+        """Test that tfvars and test files are tracked alongside .tf files."""
+        for name in ("main.tf", "dev.tfvars", "main.tftest.hcl", "notes.md"):
+            (fast_tmp_path / name).write_text("# file\n")
+
+        stats = CodeFormatter._scan_tf_files([fast_tmp_path])
+
+        assert sorted(Path(name).name for name in stats) == [
+            "dev.tfvars",
+            "main.tf",
+            "main.tftest.hcl",
+        ]
+
+    def test_tf_cache_round_trip(self, fast_tmp_path: Path) -> None:
+        """Test that the Terraform format cache survives a save and load."""
+        formatter = CodeFormatter(fast_tmp_path)
+        assert formatter._load_tf_cache() == {}
+
+        formatter._save_tf_cache({"main.tf": [1, 2]})
+
+        assert formatter._load_tf_cache() == {"main.tf": [1, 2]}
+        assert list((fast_tmp_path / ".cache").iterdir()) == [
+            fast_tmp_path / ".cache" / "format-tf.json"
+        ]
+
+
+class TestGitChangedFiles:
+    """Test cases for the --changed file discovery."""
+
+    def test_returns_none_outside_git(self, fast_tmp_path: Path) -> None:
+        """Test that a non-repository falls back to formatting everything."""
+        assert _git_changed_files(fast_tmp_path) is None
+
+    def test_lists_modified_staged_and_untracked(self, fast_tmp_path: Path) -> None:
+        """Test that only changed, existing files are returned."""
+
+        def git(*args: str) -> None:
+            subprocess.run(
+                ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                cwd=fast_tmp_path,
+                check=True,
+                capture_output=True,
+            )
+
+        git("init", "-q")
+        for name in ("clean.py", "edited.py", "staged.tf", "removed.py"):
+            (fast_tmp_path / name).write_text("x = 1\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+
+        (fast_tmp_path / "edited.py").write_text("x = 2\n")
+        (fast_tmp_path / "staged.tf").write_text("# staged\n")
+        git("add", "staged.tf")
+        (fast_tmp_path / "removed.py").unlink()
+        (fast_tmp_path / "new.py").write_text("y = 1\n")
+
+        changed = _git_changed_files(fast_tmp_path)
+
+        assert changed is not None
+        assert [p.name for p in changed] == ["edited.py", "new.py", "staged.tf"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,19 +1,29 @@
 """Test cases for the resource-group Terraform module."""
 
 from pathlib import Path
+from typing import Mapping
 
 import pytest
 
+from tests._source_cache import module_sources
+
+
+@pytest.fixture(scope="module")
+def module_path() -> Path:
+    """Get the path to the resource-group module."""
+    project_root = Path(__file__).parent.parent
+    return project_root / "terraform" / "foundation" / "resource-group"
+
+
+@pytest.fixture
+def tf_sources(module_path: Path) -> Mapping[str, str]:
+    """Contents of the module's files by name, read once per session."""
+    return module_sources(module_path)
+
 
 class TestResourceGroupModule:
     """Test cases for the resource-group module structure and content."""
 
-    @pytest.fixture
-    def module_path(self) -> Path:
-        """Get the path to the resource-group module."""
-        project_root = Path(__file__).parent.parent
-        return project_root / "terraform" / "foundation" / "resource-group"
-
     def test_module_files_exist(self, module_path: Path) -> None:
         """Test that all required module files exist."""
         required_files = [
@@ -39,48 +49,49 @@ class TestResourceGroupModule:
                 file_path.exists()
             ), f"Required example file {file_name} does not exist"
 
-    def test_main_tf_contains_resource(self, module_path: Path) -> None:
+    def test_main_tf_contains_resource(self, tf_sources: Mapping[str, str]) -> None:
         """Test that main.tf contains the azurerm_resource_group resource."""
-        main_tf = module_path / "main.tf"
-        content = main_tf.read_text()
+        content = tf_sources["main.tf"]
 
         assert 'resource "azurerm_resource_group" "this"' in content
         assert "name     = var.name" in content
         assert "location = var.location" in content
         assert "tags     = var.tags" in content
 
-    def test_variables_tf_contains_required_vars(self, module_path: Path) -> None:
+    def test_variables_tf_contains_required_vars(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that variables.tf contains required variables."""
-        variables_tf = module_path / "variables.tf"
-        content = variables_tf.read_text()
+        content = tf_sources["variables.tf"]
 
         assert 'variable "name"' in content
         assert 'variable "location"' in content
         assert 'variable "tags"' in content
 
-    def test_outputs_tf_contains_required_outputs(self, module_path: Path) -> None:
+    def test_outputs_tf_contains_required_outputs(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that outputs.tf contains required outputs."""
-        outputs_tf = module_path / "outputs.tf"
-        content = outputs_tf.read_text()
+        content = tf_sources["outputs.tf"]
 
         assert 'output "id"' in content
         assert 'output "name"' in content
         assert 'output "location"' in content
         assert 'output "tags"' in content
 
-    def test_versions_tf_contains_requirements(self, module_path: Path) -> None:
+    def test_versions_tf_contains_requirements(
+        self, tf_sources: Mapping[str, str]
+    ) -> None:
         """Test that versions.tf contains terraform and provider requirements."""
-        versions_tf = module_path / "versions.tf"
-        content = versions_tf.read_text()
+        content = tf_sources["versions.tf"]
 
         assert 'required_version = ">= 1.0"' in content
         assert "hashicorp/azurerm" in content
         assert 'version = ">= 3.0"' in content
 
-    def test_readme_exists_and_has_content(self, module_path: Path) -> None:
+    def test_readme_exists_and_has_content(self, tf_sources: Mapping[str, str]) -> None:
         """Test that README.md exists and has basic content."""
-        readme = module_path / "README.md"
-        content = readme.read_text()
+        content = tf_sources["README.md"]
 
         assert "# Azure Resource Group Module" in content
         assert "## Usage" in content
@@ -90,8 +101,15 @@ class TestResourceGroupModule:
 
     def test_example_references_module_correctly(self, module_path: Path) -> None:
         """Test that the example references the module correctly."""
-        example_main = module_path / "examples" / "basic" / "main.tf"
-        content = example_main.read_text()
+        content = module_sources(module_path / "examples" / "basic")["main.tf"]
 
         assert 'module "resource_group"' in content
         assert 'source = "../../"' in content
+
+
+def test_module_sources_skip_binary_files(fast_tmp_path: Path) -> None:
+    """Test that only text sources are read, so stray binary files are ignored."""
+    (fast_tmp_path / "main.tf").write_text('resource "x" "y" {}\n')
+    (fast_tmp_path / ".DS_Store").write_bytes(b"\x00\x00\x00\x01Bud1\xff\xfe")
+
+    assert dict(module_sources(fast_tmp_path)) == {"main.tf": 'resource "x" "y" {}\n'}
@@ -2,25 +2,48 @@
 Tests for the validate.py script.
 """
 
-import sys
 from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, List
 
 import pytest
 
-# Add scripts directory to Python path before importing from validate module
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+if TYPE_CHECKING:
+    from validate import TerraformValidator
 
-# This import must come after sys.path modification  # noqa: E402
-from validate import TerraformValidator
+# Tests never change directory, so the working directory is read once
+BASE_PATH = Path.cwd()
+HAS_TERRAFORM_DIR = (BASE_PATH / "terraform").is_dir()
+
+
+@pytest.fixture(scope="module")
+def validate_module() -> ModuleType:
+    """The ``validate`` script, imported only once a test needs it.
+
+    Collecting, deselecting or skipping these tests never pays for the import.
+    """
+    import validate
+
+    return validate
+
+
+@pytest.fixture(scope="module")
+def shared_validator(validate_module: ModuleType) -> "TerraformValidator":
+    """One validator for the repository, reset by each test that uses it."""
+    return validate_module.TerraformValidator(BASE_PATH)
 
 
 class TestTerraformValidator:
     """Test cases for TerraformValidator class."""
 
-    def setup_method(self) -> None:
+    @pytest.fixture(autouse=True)
+    def setup_validator(self, shared_validator: "TerraformValidator") -> None:
         """Set up test fixtures."""
-        self.base_path = Path.cwd()
-        self.validator = TerraformValidator(self.base_path)
+        shared_validator.errors.clear()
+        shared_validator.warnings.clear()
+        shared_validator.clear_cache()
+        self.base_path = shared_validator.base_path
+        self.validator = shared_validator
 
     def test_validator_initialization(self) -> None:
         """Test that validator initializes correctly."""
@@ -28,80 +51,221 @@ class TestTerraformValidator:
         assert self.validator.errors == []
         assert self.validator.warnings == []
 
-    def test_has_terraform_files_with_tf_files(self, tmp_path: Path) -> None:
+    def test_has_terraform_files_with_tf_files(self, fast_tmp_path: Path) -> None:
         """Test detecting Terraform files in directory."""
         # Create a temporary directory with .tf files
-        tf_file = tmp_path / "main.tf"
-        tf_file.write_text("# Test terraform file")
+        (fast_tmp_path / "main.tf").touch()
 
-        assert self.validator._has_terraform_files(tmp_path) is True
+        assert self.validator._has_terraform_files(fast_tmp_path) is True
 
-    def test_has_terraform_files_without_tf_files(self, tmp_path: Path) -> None:
+    def test_has_terraform_files_without_tf_files(self, fast_tmp_path: Path) -> None:
         """Test detecting no Terraform files in directory."""
         # Create a temporary directory without .tf files
-        txt_file = tmp_path / "readme.txt"
-        txt_file.write_text("Not a terraform file")
+        (fast_tmp_path / "readme.txt").touch()
+
+        assert self.validator._has_terraform_files(fast_tmp_path) is False
+
+    def test_has_terraform_files_is_cached(self, fast_tmp_path: Path) -> None:
+        """Test that a directory's verdict is reused until the cache is cleared."""
+        tf_file = fast_tmp_path / "main.tf"
+        tf_file.touch()
+        assert self.validator._has_terraform_files(fast_tmp_path) is True
 
-        assert self.validator._has_terraform_files(tmp_path) is False
+        tf_file.unlink()
+        assert self.validator._has_terraform_files(fast_tmp_path) is True
 
-    def test_find_modules_empty_directory(self, tmp_path: Path) -> None:
+        self.validator.clear_cache()
+        assert self.validator._has_terraform_files(fast_tmp_path) is False
+
+    def test_find_modules_empty_directory(self, fast_tmp_path: Path) -> None:
         """Test finding modules in empty directory."""
-        modules = self.validator.find_modules(tmp_path)
+        modules = self.validator.find_modules(fast_tmp_path)
         assert modules == []
 
-    def test_find_modules_with_terraform_files(self, tmp_path: Path) -> None:
+    def test_find_modules_with_terraform_files(
+        self, mutable_sample_terraform_module: Path
+    ) -> None:
         """Test finding modules with Terraform files."""
-        # Create module directory structure
-        module_dir = tmp_path / "test-module"
-        module_dir.mkdir()
+        modules = self.validator.find_modules(mutable_sample_terraform_module.parent)
+        assert len(modules) == 1
+        assert modules[0] == mutable_sample_terraform_module
 
-        # Add terraform files
-        (module_dir / "main.tf").write_text("# Main terraform file")
-        (module_dir / "variables.tf").write_text("# Variables file")
+    def test_iter_modules_yields_each_module(
+        self, mutable_sample_terraform_module: Path
+    ) -> None:
+        """Test that modules can be consumed lazily from the walk."""
+        modules = self.validator.iter_modules(mutable_sample_terraform_module.parent)
 
-        modules = self.validator.find_modules(tmp_path)
-        assert len(modules) == 1
-        assert modules[0] == module_dir
+        assert next(modules) == mutable_sample_terraform_module
+        assert next(modules, None) is None
 
-    def test_check_documentation_complete(self, tmp_path: Path) -> None:
-        """Test documentation check with all required files."""
-        # Create all required documentation files
-        (tmp_path / "README.md").write_text("# Module Documentation")
-        (tmp_path / "variables.tf").write_text("# Variables")
-        (tmp_path / "outputs.tf").write_text("# Outputs")
+    def test_find_modules_skips_examples(self, fast_tmp_path: Path) -> None:
+        """Test that nested modules are found and example directories skipped."""
+        for module in ("a", "a/nested", "a/examples/basic", "b/no-tf"):
+            (fast_tmp_path / module).mkdir(parents=True)
+        for tf_file in ("a/main.tf", "a/nested/main.tf", "a/examples/basic/main.tf"):
+            (fast_tmp_path / tf_file).touch()
+        (fast_tmp_path / "b" / "no-tf" / "README.md").touch()
+
+        modules = self.validator.find_modules(fast_tmp_path)
 
-        result = self.validator._check_documentation(tmp_path)
+        assert modules == [fast_tmp_path / "a", fast_tmp_path / "a" / "nested"]
+        assert self.validator._has_terraform_files(fast_tmp_path / "b") is False
+
+    def test_check_documentation_complete(self, sample_terraform_module: Path) -> None:
+        """Test documentation check with all required files."""
+        result = self.validator._check_documentation(sample_terraform_module)
         assert result is True
         assert len(self.validator.warnings) == 0
 
-    def test_check_documentation_missing_files(self, tmp_path: Path) -> None:
+    @pytest.mark.parametrize(
+        "present_files,missing_count",
+        [
+            (["README.md"], 2),  # Missing variables.tf and outputs.tf
+            ([], 3),  # Missing all three files
+        ],
+    )
+    def test_check_documentation_missing_files(
+        self, fast_tmp_path: Path, present_files: List[str], missing_count: int
+    ) -> None:
         """Test documentation check with missing files."""
-        # Only create README, missing variables and outputs
-        (tmp_path / "README.md").write_text("# Module Documentation")
+        for file_name in present_files:
+            (fast_tmp_path / file_name).touch()
 
-        result = self.validator._check_documentation(tmp_path)
+        result = self.validator._check_documentation(fast_tmp_path)
         assert result is False
-        assert len(self.validator.warnings) == 2  # Missing variables.tf and outputs.tf
+        assert len(self.validator.warnings) == missing_count
 
-    def test_check_documentation_no_files(self, tmp_path: Path) -> None:
-        """Test documentation check with no documentation files."""
-        result = self.validator._check_documentation(tmp_path)
-        assert result is False
-        assert len(self.validator.warnings) == 3  # Missing all three files
+    def test_init_reused_until_lock_file_changes(self, fast_tmp_path: Path) -> None:
+        """Test that a module's init is only reused while its lock file holds."""
+        (fast_tmp_path / ".terraform" / "providers").mkdir(parents=True)
+        lock_file = fast_tmp_path / ".terraform.lock.hcl"
+        lock_file.write_text('provider "azurerm" {}\n')
+
+        assert self.validator._init_is_current(fast_tmp_path) is False
+
+        self.validator._remember_init(fast_tmp_path)
+        assert self.validator._init_is_current(fast_tmp_path) is True
+
+        lock_file.write_text('provider "azuread" {}\n')
+        assert self.validator._init_is_current(fast_tmp_path) is False
+
+    def test_provider_fingerprint_shared_by_matching_modules(
+        self, validate_module: ModuleType, fast_tmp_path: Path
+    ) -> None:
+        """Test that modules pinning the same providers share a fingerprint."""
+        versions = "terraform {\n  required_providers {\n    azurerm = {}\n  }\n}\n"
+        for name, main in (("a", "# a\n"), ("b", "# b\n"), ("c", "# c\n")):
+            (fast_tmp_path / name).mkdir()
+            (fast_tmp_path / name / "versions.tf").write_text(versions)
+            (fast_tmp_path / name / "main.tf").write_text(main)
+        (fast_tmp_path / "c" / "versions.tf").write_text(versions.replace("rm", "d"))
+        # The same settings in another file pin the same providers
+        (fast_tmp_path / "b" / "versions.tf").rename(
+            fast_tmp_path / "b" / "terraform.tf"
+        )
+
+        fingerprint = validate_module.provider_fingerprint
+
+        assert fingerprint(fast_tmp_path / "a") == fingerprint(fast_tmp_path / "b")
+        assert fingerprint(fast_tmp_path / "a") != fingerprint(fast_tmp_path / "c")
+
+    def test_provider_fingerprint_skips_modules_without_required_providers(
+        self, validate_module: ModuleType, fast_tmp_path: Path
+    ) -> None:
+        """Test that modules relying on implicit providers keep a private init."""
+        (fast_tmp_path / "main.tf").write_text(
+            'terraform {\n  required_version = ">= 1.5"\n}\n'
+            'resource "random_id" "this" {\n  byte_length = 4\n}\n'
+        )
+
+        assert validate_module.provider_fingerprint(fast_tmp_path) is None
+
+    def test_provider_fingerprint_skips_modules_with_child_modules(
+        self, validate_module: ModuleType, fast_tmp_path: Path
+    ) -> None:
+        """Test that modules calling other modules keep a private init."""
+        (fast_tmp_path / "main.tf").write_text(
+            'module "child" {\n  source = "../x"\n}\n'
+        )
+
+        assert validate_module.provider_fingerprint(fast_tmp_path) is None
+
+    def test_cache_key_tracks_module_content(self, fast_tmp_path: Path) -> None:
+        """Test that cached results are keyed by content and scan settings."""
+        (fast_tmp_path / "main.tf").write_text("# main\n")
+        (fast_tmp_path / "notes.txt").write_text("ignored\n")
+        key = self.validator._cache_key(fast_tmp_path, run_security=True)
+
+        (fast_tmp_path / "notes.txt").write_text("still ignored\n")
+        assert self.validator._cache_key(fast_tmp_path, run_security=True) == key
+        assert self.validator._cache_key(fast_tmp_path, run_security=False) != key
+
+        (fast_tmp_path / "README.md").write_text("# Module\n")
+        assert self.validator._cache_key(fast_tmp_path, run_security=True) != key
+
+    def test_cache_key_tracks_lock_file_and_local_modules(
+        self, fast_tmp_path: Path
+    ) -> None:
+        """Test that a parent's key changes with its lock file and child modules."""
+        for name in ("parent", "child", "grandchild"):
+            (fast_tmp_path / name).mkdir()
+        (fast_tmp_path / "parent" / "main.tf").write_text(
+            'module "child" {\n  source = "../child"\n}\n'
+        )
+        (fast_tmp_path / "child" / "main.tf").write_text(
+            'module "grandchild" {\n  source = "../grandchild"\n}\n'
+        )
+        grandchild = fast_tmp_path / "grandchild" / "main.tf"
+        grandchild.write_text("# v1\n")
+        parent = fast_tmp_path / "parent"
+        key = self.validator._cache_key(parent, run_security=False)
+
+        grandchild.write_text("# v2\n")
+        changed_child = self.validator._cache_key(parent, run_security=False)
+        assert changed_child != key
+
+        (parent / ".terraform.lock.hcl").write_text('provider "azurerm" {}\n')
+        assert self.validator._cache_key(parent, run_security=False) != changed_child
+
+    def test_validate_diagnostics_summarises_errors(self) -> None:
+        """Test that errors from ``terraform validate -json`` are summarised."""
+        output = (
+            '{"valid": false, "diagnostics": ['
+            '{"severity": "warning", "summary": "Deprecated"},'
+            '{"severity": "error", "summary": "Missing argument",'
+            ' "detail": "name is required",'
+            ' "range": {"filename": "main.tf", "start": {"line": 3}}}]}'
+        )
+
+        assert type(self.validator)._validate_diagnostics(output) == (
+            "Missing argument: name is required (main.tf:3)"
+        )
+        assert type(self.validator)._validate_diagnostics("Error: not json") == ""
+
+    def test_failed_checks_reads_every_report(
+        self, validate_module: ModuleType
+    ) -> None:
+        """Test that failed checks are gathered from Checkov's JSON reports."""
+        _failed_checks = validate_module._failed_checks
+        report = '{"results": {"failed_checks": [{"check_id": "CKV_1"}]}}'
+
+        assert _failed_checks(report) == [{"check_id": "CKV_1"}]
+        assert len(_failed_checks(f"[{report}, {report}]")) == 2
+        assert _failed_checks("") == []
+        with pytest.raises(ValueError):
+            _failed_checks("Check: CKV_1 FAILED")
 
 
 @pytest.mark.integration
 class TestIntegrationValidation:
     """Integration tests for validation functions."""
 
-    @pytest.mark.skipif(
-        not Path("terraform").exists(), reason="Terraform directory not found"
-    )
-    def test_find_real_modules(self) -> None:
+    @pytest.mark.skipif(not HAS_TERRAFORM_DIR, reason="Terraform directory not found")
+    def test_find_real_modules(self, validate_module: ModuleType) -> None:
         """Test finding modules in actual terraform directory."""
-        base_path = Path.cwd()
-        validator = TerraformValidator(base_path)
-        terraform_dir = base_path / "terraform"
+        validator = validate_module.TerraformValidator(BASE_PATH)
+        terraform_dir = BASE_PATH / "terraform"
 
         modules = validator.find_modules(terraform_dir)
         # This should not fail even if no modules exist yet